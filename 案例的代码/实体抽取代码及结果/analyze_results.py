@@ -67,10 +67,10 @@ key_relations_to_check = [
     ("哪吒", "师父", "太乙真人"),
     ("哪吒", "朋友", "敖丙"),
     ("哪吒", "敌人", "敖丙"),
-    ("吴承恩", "创作", "《西游记》"),
-    ("许仲琳", "创作", "《封神演义》"),
-    ("饺子", "导演", "《哪吒之魔童降世》"),
-    ("《哪吒之魔童降世》", "改编自", "《封神演义》"),
+    ("吴承恩", "创作", "西游记"),
+    ("许仲琳", "创作", "封神演义"),
+    ("饺子", "导演", "哪吒之魔童降世"),
+    ("哪吒之魔童降世", "改编自", "封神演义"),
 ]
 
 found_count = 0
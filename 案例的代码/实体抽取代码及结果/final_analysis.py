@@ -98,11 +98,11 @@ print("-" * 40)
 key_knowledge = [
     ("哪吒", "父亲", "李靖", "家庭关系"),
     ("哪吒", "师父", "太乙真人", "师徒关系"),
-    ("哪吒", "出现于", "《封神演义》", "作品归属"),
-    ("吴承恩", "创作", "《西游记》", "文学创作"),
-    ("许仲琳", "创作", "《封神演义》", "文学创作"),
-    ("饺子", "导演", "《哪吒之魔童降世》", "影视创作"),
-    ("《哪吒之魔童降世》", "改编自", "《封神演义》", "作品改编"),
+    ("哪吒", "出现于", "封神演义", "作品归属"),
+    ("吴承恩", "创作", "西游记", "文学创作"),
+    ("许仲琳", "创作", "封神演义", "文学创作"),
+    ("饺子", "导演", "哪吒之魔童降世", "影视创作"),
+    ("哪吒之魔童降世", "改编自", "封神演义", "作品改编"),
     ("哪吒", "敌人", "敖丙", "敌对关系"),
     ("哪吒", "朋友", "敖丙", "朋友关系"),
 ]
@@ -103,11 +103,11 @@ print("-" * 40)
 key_knowledge = [
     ("哪吒", "父亲", "李靖"),
     ("哪吒", "师父", "太乙真人"),
-    ("哪吒", "出现于", "《封神演义》"),
-    ("吴承恩", "创作", "《西游记》"),
-    ("许仲琳", "创作", "《封神演义》"),
-    ("饺子", "导演", "《哪吒之魔童降世》"),
-    ("《哪吒之魔童降世》", "改编自", "《封神演义》"),
+    ("哪吒", "出现于", "封神演义"),
+    ("吴承恩", "创作", "西游记"),
+    ("许仲琳", "创作", "封神演义"),
+    ("饺子", "导演", "哪吒之魔童降世"),
+    ("哪吒之魔童降世", "改编自", "封神演义"),
 ]
 
 found = []
@@ -10,17 +10,28 @@ if sys.platform == 'win32':
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
+# 语料库读取（数据清洗阶段生成的 corpus.txt + corpus.idx）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据清洗代码"))
+from corpus_store import CorpusStore, is_corpus
+from entity_registry import load_registry
+from mention_index import MentionIndex
+
 def print_section(title):
     """打印标题"""
     print("\n" + "=" * 60)
     print(f" {title}")
     print("=" * 60)
 
-def load_text():
-    """加载文本文件"""
+def load_text(file_path="data/all_text.txt"):
+    """加载文本文件，也可以直接传入语料库（corpus.idx / corpus.txt）"""
     print("正在加载文本文件...")
     
-    file_path = "data/all_text.txt"
+    if is_corpus(file_path):
+        with CorpusStore(file_path) as corpus:
+            content = corpus.full_text()
+        print(f"✓ 成功加载语料库，{len(corpus)} 篇文档，长度: {len(content):,} 字符")
+        return content
+    
     if not os.path.exists(file_path):
         print(f"错误：找不到文件 {file_path}")
         return None
@@ -34,35 +45,26 @@ def load_text():
         print(f"✗ 加载失败: {e}")
         return None
 
-def extract_entities(text):
-    """提取实体"""
+def extract_entities(text, doc_starts=None):
+    """提取实体；同一次扫描建立实体位置索引，保存为 output/mentions.idx"""
     print_section("实体识别")
     
-    # 哪吒相关实体词典
-    entities_dict = {
-        "神话人物": ["哪吒", "李靖", "殷夫人", "太乙真人", "敖丙", "申公豹",
-                   "无量仙翁", "玉皇大帝", "龙王", "东海龙王"],
-        
-        "创作者": ["吴承恩", "许仲琳", "饺子", "乌尔善"],
-        
-        "学者": ["焦杰", "付方彦", "程国赋", "张茗", "李妙然"],
-        
-        "作品": ["《封神演义》", "《西游记》", "《哪吒之魔童降世》",
-                "《哪吒之魔童闹海》", "《大闹天宫》", "《哪吒闹海》"],
-        
-        "概念": ["魔丸", "灵珠", "乾坤圈", "风火轮", "火尖枪", "混天绫",
-                "我命由我不由天", "神化", "人化"],
-        
-        "时间": ["唐代", "宋代", "元代", "明代", "1961年", "1979年",
-                "2019年", "2025年"],
-    }
+    # 哪吒相关实体词典：统一实体注册表中带 main 标签的实体（别名已归并到规范名）
+    registry = load_registry()
+    entities_dict = registry.grouped("main")
     
     entities = []
     entity_count = {}
     
+    # 注册表为 main 标签预编译的自动机（只含本脚本的词条），一次扫描计数；重叠时只算最长的，东海龙王、《封神演义》等别名计入规范名
+    mentions = MentionIndex.build(text, registry.matcher("main"), doc_starts)
+    os.makedirs("output", exist_ok=True)
+    mentions.save("output/mentions.idx")
+    counts = mentions.counts()
+    
     for entity_type, keywords in entities_dict.items():
         for keyword in keywords:
-            count = text.count(keyword)
+            count = counts.get(keyword, 0)
             if count > 0:
                 entities.append({
                     "text": keyword,
@@ -87,36 +89,49 @@ def extract_entities(text):
     
     return entities_sorted
 
-def extract_relations(text, entities):
-    """提取关系"""
-    print_section("关系抽取")
+# 关系模板：(主语与宾语之间的提示词, 宾语之后紧跟的后缀, 关系)，主语、宾语都必须是已识别的实体
+RELATION_TEMPLATES = [
+    # 创作关系
+    ("创作", "", "创作"),
+    ("编写", "", "创作"),
     
-    # 简化关系模式（只找最关键的）
-    relation_patterns = [
-        # 创作关系
-        (r'([^，。]+?)创作《([^》]+)》', '创作'),
-        (r'([^，。]+?)编写《([^》]+)》', '创作'),
-        
-        # 父子关系
-        (r'([^，。]+?)是([^，。]+?)的父亲', '父亲'),
-        (r'([^，。]+?)是([^，。]+?)的母亲', '母亲'),
-        
-        # 师徒关系
-        (r'([^，。]+?)是([^，。]+?)的师父', '师父'),
-        
-        # 改编关系
-        (r'《([^》]+)》改编自《([^》]+)》', '改编自'),
-        
-        # 研究关系
-        (r'([^，。]+?)研究([^，。]+?)', '研究'),
-        (r'([^，。]+?)分析([^，。]+?)', '研究'),
-        
-        # 敌对关系
-        (r'([^，。]+?)与([^，。]+?)是敌人', '敌人'),
-        
-        # 朋友关系
-        (r'([^，。]+?)与([^，。]+?)是朋友', '朋友'),
-    ]
+    # 父子关系
+    ("是", "的父亲", "父亲"),
+    ("是", "的母亲", "母亲"),
+    
+    # 师徒关系
+    ("是", "的师父", "师父"),
+    
+    # 改编关系
+    ("改编自", "", "改编自"),
+    
+    # 研究关系
+    ("研究", "", "研究"),
+    ("分析", "", "研究"),
+    
+    # 敌对关系
+    ("与", "是敌人", "敌人"),
+    
+    # 朋友关系
+    ("与", "是朋友", "朋友"),
+]
+
+# 所有提示词合成一个带命名分支的正则，只用于匹配两个相邻实体之间的间隔，长度有上限
+_CUES = list(dict.fromkeys(cue for cue, _, _ in RELATION_TEMPLATES))
+RELATION_GAP = re.compile("|".join(
+    rf"(?P<c{i}>\s{{0,2}}{re.escape(cue)}\s{{0,2}})" for i, cue in enumerate(_CUES)))
+MAX_GAP = max(len(cue) for cue in _CUES) + 4
+# 提示词 -> [(后缀, 关系)]
+_SUFFIXES = {}
+for _cue, _suffix, _relation in RELATION_TEMPLATES:
+    _SUFFIXES.setdefault(f"c{_CUES.index(_cue)}", []).append((_suffix, _relation))
+
+def extract_relations(text, entities, mentions=None):
+    """提取关系
+    以实体位置为锚点：只检查同一分句中前后相邻的两个已识别实体，
+    两者之间的间隔须恰好是某个提示词（用合并后的正则一次判断），再核对宾语之后的后缀；
+    mentions 为 extract_entities 建立的实体位置索引，不提供时重新扫描一遍文本"""
+    print_section("关系抽取")
     
     relations = []
     seen = set()
@@ -124,33 +139,38 @@ def extract_relations(text, entities):
     # 从实体列表中提取实体文本
     entity_texts = [e["text"] for e in entities]
     
-    for pattern, rel_type in relation_patterns:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            if len(match.groups()) >= 2:
-                subject = match.group(1).strip()
-                obj = match.group(2).strip()
-                
-                # 检查是否是我们关心的实体
-                if subject in entity_texts and obj in entity_texts:
-                    key = f"{subject}|{rel_type}|{obj}"
-                    if key not in seen:
-                        seen.add(key)
-                        relations.append({
-                            "subject": subject,
-                            "predicate": rel_type,
-                            "object": obj
-                        })
+    if mentions is None:
+        mentions = MentionIndex.build(text, load_registry().matcher("main"))
+    spans = sorted((start, end, name)
+                   for name in entity_texts if name in mentions.ids
+                   for start, end, _, _ in mentions.iter_mentions(name))
+    
+    for (_, x_end, subject), (y_start, y_end, obj) in zip(spans, spans[1:]):
+        if y_start - x_end > MAX_GAP:
+            continue
+        match = RELATION_GAP.fullmatch(text, x_end, y_start)
+        if match is None:
+            continue
+        for suffix, rel_type in _SUFFIXES[match.lastgroup]:
+            if text.startswith(suffix, y_end):
+                key = f"{subject}|{rel_type}|{obj}"
+                if key not in seen:
+                    seen.add(key)
+                    relations.append({
+                        "subject": subject,
+                        "predicate": rel_type,
+                        "object": obj
+                    })
     
     # 添加一些已知的重要关系
     known_relations = [
         ("哪吒", "父亲", "李靖"),
         ("哪吒", "师父", "太乙真人"),
-        ("吴承恩", "创作", "《西游记》"),
-        ("许仲琳", "创作", "《封神演义》"),
-        ("饺子", "导演", "《哪吒之魔童降世》"),
-        ("哪吒", "出现于", "《封神演义》"),
-        ("《哪吒之魔童降世》", "改编自", "《封神演义》"),
+        ("吴承恩", "创作", "西游记"),
+        ("许仲琳", "创作", "封神演义"),
+        ("饺子", "导演", "哪吒之魔童降世"),
+        ("哪吒", "出现于", "封神演义"),
+        ("哪吒之魔童降世", "改编自", "封神演义"),
     ]
     
     for subject, predicate, obj in known_relations:
@@ -300,6 +320,7 @@ def save_results(entities, relations, triples, nezha_triples):
     print("  output/triples.csv        - 所有三元组 (Excel可打开)")
     print("  output/nezha_triples.csv  - 哪吒相关三元组")
     print("  output/entities.json      - 所有实体")
+    print("  output/mentions.idx       - 实体位置索引（位置/文档/句子）")
     print("  output/relations.json     - 所有关系")
     print("  output/statistics.json    - 统计信息")
     print("  output/report.txt         - 文本报告")
@@ -309,16 +330,23 @@ def main():
     print("哪吒知识图谱构建系统")
     print("=" * 60)
     
-    # 1. 加载文本
-    text = load_text()
+    # 1. 加载文本（可在命令行指定 all_text.txt 或语料库路径）
+    text_path = sys.argv[1] if len(sys.argv) > 1 else "data/all_text.txt"
+    text = load_text(text_path)
     if not text:
         return
     
+    # 语料库中各篇文档的起始位置，用于实体位置索引中的文档编号
+    doc_starts = None
+    if is_corpus(text_path):
+        with CorpusStore(text_path) as corpus:
+            doc_starts = corpus.doc_char_starts()
+    
     # 2. 提取实体
-    entities = extract_entities(text)
+    entities = extract_entities(text, doc_starts)
     
-    # 3. 提取关系
-    relations = extract_relations(text, entities)
+    # 3. 提取关系（复用实体识别阶段保存的位置索引）
+    relations = extract_relations(text, entities, MentionIndex.load("output/mentions.idx"))
     
     # 4. 构建三元组
     triples, nezha_triples = build_triples(entities, relations)
@@ -5,68 +5,75 @@
 import re
 import json
 import os
+import sys
+import argparse
+
+# 语料库读取（数据清洗阶段生成的 corpus.txt + corpus.idx）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "数据清洗代码"))
+from corpus_store import CorpusStore, is_corpus
+from entity_registry import load_registry
+from mention_index import MentionIndex
 
 class NeZhaExtractor:
     def __init__(self):
+        # 人物和作品取自统一实体注册表（带 extractor 标签的实体）
+        self.registry = load_registry()
+        
         # 哪吒相关的人物列表
-        self.characters = [
-            '哪吒', '李靖', '殷夫人', '太乙真人', '敖丙', '申公豹',
-            '元始天尊', '纣王', '姬发', '姜子牙', '孙悟空', '龙王',
-            '无量仙翁', '石矶娘娘', '伯邑考', '周文王', '杨戬', '妲己'
-        ]
+        self.characters = self.registry.names('人物', 'extractor')
         
         # 相关作品
-        self.works = [
-            '封神演义', '西游记', '哪吒闹海', '哪吒之魔童降世',
-            '哪吒之魔童闹海', '哪吒传奇', '大闹天宫'
+        self.works = self.registry.names('作品', 'extractor')
+        
+        # 关系规则：(对象, 关系, 提示词)，主语均为哪吒；对象与任一提示词同时出现即成立
+        self.relation_rules = [
+            ('李靖', '父亲', ('父亲', '父子')),
+            ('殷夫人', '母亲', ('母亲', '母子')),
+            ('太乙真人', '师父', ('师父', '师傅')),
+            ('敖丙', '朋友', ('朋友',)),
+            ('龙王', '敌人', ('敌人', '对抗')),
+            ('申公豹', '敌人', ('敌人', '对抗')),
         ]
+        
+        # 最近一次 find_entities 建立的实体位置索引及其对应的文本
+        self.mentions = None
+        self._indexed_text = None
     
     def load_text(self, file_path):
-        """读取文本文件"""
+        """读取文本文件，也可以直接传入语料库（corpus.idx / corpus.txt）"""
+        if is_corpus(file_path):
+            with CorpusStore(file_path) as corpus:
+                return corpus.full_text()
         with open(file_path, 'r', encoding='utf-8') as f:
             return f.read()
     
     def find_entities(self, text):
-        """找出文本中的人物和作品"""
-        found_chars = []
-        found_works = []
-        
-        for char in self.characters:
-            if char in text:
-                found_chars.append(char)
-        
-        for work in self.works:
-            if work in text:
-                found_works.append(work)
-        
+        """找出文本中的人物和作品（一次扫描，重叠时取最长的词条，别名计入规范名），同时建立实体位置索引"""
+        self.mentions = MentionIndex.build(text, self.matcher())
+        self._indexed_text = text
+        found = set(self.mentions.counts())
+        found_chars = [char for char in self.characters if char in found]
+        found_works = [work for work in self.works if work in found]
         return found_chars, found_works
     
-    def extract_relations(self, text):
-        """提取哪吒的关系"""
-        relations = []
-        
-        # 1. 父子关系
-        if '李靖' in text and ('父亲' in text or '父子' in text):
-            relations.append(['哪吒', '父亲', '李靖'])
-        
-        # 2. 母子关系
-        if '殷夫人' in text and ('母亲' in text or '母子' in text):
-            relations.append(['哪吒', '母亲', '殷夫人'])
-        
-        # 3. 师徒关系
-        if '太乙真人' in text and ('师父' in text or '师傅' in text):
-            relations.append(['哪吒', '师父', '太乙真人'])
-        
-        # 4. 朋友关系
-        if '敖丙' in text and '朋友' in text:
-            relations.append(['哪吒', '朋友', '敖丙'])
+    def matcher(self):
+        """注册表为 extractor 标签预编译的自动机（只含本脚本的词条，首次使用时从磁盘缓存加载）"""
+        return self.registry.matcher('extractor')
+    
+    def extract_relations(self, text, by_sentence=False):
+        """提取哪吒的关系
+        by_sentence=False：对象和提示词在全文任意位置出现即成立
+        by_sentence=True：哪吒、对象和提示词必须出现在同一句中（作品关系为哪吒与作品同句），
+        每条关系后附支持句数；只检查哪吒与对象共同出现的句子（由实体位置索引求交集得到）"""
+        if by_sentence:
+            return self._extract_relations_by_sentence(text)
         
-        # 5. 敌人关系
-        if '龙王' in text and ('敌人' in text or '对抗' in text):
-            relations.append(['哪吒', '敌人', '龙王'])
+        relations = []
         
-        if '申公豹' in text and ('敌人' in text or '对抗' in text):
-            relations.append(['哪吒', '敌人', '申公豹'])
+        # 1~5. 父子、母子、师徒、朋友、敌人关系
+        for obj, relation, cues in self.relation_rules:
+            if obj in text and any(cue in text for cue in cues):
+                relations.append(['哪吒', relation, obj])
         
         # 6. 作品关系
         for work in self.works:
@@ -75,8 +82,29 @@ class NeZhaExtractor:
         
         return relations
     
-    def run(self, input_file):
-        """运行抽取程序"""
+    def _extract_relations_by_sentence(self, text):
+        # 位置索引必须建立在同一份文本上
+        if self.mentions is None or self._indexed_text is not text:
+            self.find_entities(text)
+        mentions = self.mentions
+        
+        relations = []
+        for obj, relation, cues in self.relation_rules:
+            support = sum(
+                1 for sid in mentions.co_sentences('哪吒', obj)
+                if any(cue in mentions.sentence_text(text, sid) for cue in cues))
+            if support:
+                relations.append(['哪吒', relation, obj, support])
+        
+        for work in self.works:
+            support = len(mentions.co_sentences('哪吒', work))
+            if support:
+                relations.append(['哪吒', '出现在', work, support])
+        
+        return relations
+    
+    def run(self, input_file, by_sentence=False):
+        """运行抽取程序；by_sentence=True 时按句抽取关系并输出支持句数"""
         print("哪吒实体关系抽取开始...")
         print("=" * 40)
         
@@ -93,12 +121,13 @@ class NeZhaExtractor:
         print(", ".join(works))
         
         # 3. 抽取关系
-        relations = self.extract_relations(text)
+        relations = self.extract_relations(text, by_sentence)
         print(f"\n找到 {len(relations)} 条关系:")
         
         # 4. 显示结果
         for i, rel in enumerate(relations, 1):
-            print(f"{i:2d}. {rel[0]} -- {rel[1]} -- {rel[2]}")
+            support = f"（{rel[3]} 句支持）" if len(rel) > 3 else ""
+            print(f"{i:2d}. {rel[0]} -- {rel[1]} -- {rel[2]}{support}")
         
         # 5. 保存结果
         self.save_results(characters, works, relations)
@@ -126,7 +155,8 @@ class NeZhaExtractor:
             
             f.write("\n三、关系三元组:\n")
             for rel in relations:
-                f.write(f"  ({rel[0]}, {rel[1]}, {rel[2]})\n")
+                support = f"  支持句数: {rel[3]}" if len(rel) > 3 else ""
+                f.write(f"  ({rel[0]}, {rel[1]}, {rel[2]}){support}\n")
         
         print(f"\n结果已保存到: results/nezha_results.txt")
         
@@ -135,7 +165,8 @@ class NeZhaExtractor:
             'characters': characters,
             'works': works,
             'relations': [
-                {'subject': r[0], 'relation': r[1], 'object': r[2]}
+                dict({'subject': r[0], 'relation': r[1], 'object': r[2]},
+                     **({'support': r[3]} if len(r) > 3 else {}))
                 for r in relations
             ]
         }
@@ -144,9 +175,19 @@ class NeZhaExtractor:
             json.dump(result_data, f, ensure_ascii=False, indent=2)
         
         print(f"JSON格式已保存到: results/nezha_results.json")
+        
+        if self.mentions is not None:
+            mentions_path = 'results/mentions.idx'
+            self.mentions.save(mentions_path)
+            print(f"实体位置索引已保存到: {mentions_path}")
 
 def main():
     """主程序"""
+    parser = argparse.ArgumentParser(description="哪吒实体关系抽取")
+    parser.add_argument("--by-sentence", action="store_true",
+                        help="哪吒、对象和提示词须在同一句中，关系附支持句数")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("哪吒实体关系抽取系统 v1.0")
     print("=" * 50)
@@ -167,7 +208,7 @@ def main():
     
     # 创建提取器并运行
     extractor = NeZhaExtractor()
-    extractor.run(text_file)
+    extractor.run(text_file, by_sentence=args.by_sentence)
     
     print("\n" + "=" * 50)
     print("抽取完成！")
@@ -1,4 +1,6 @@
 # phase2_complete.py
+import os
+import sys
 import json
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -9,6 +11,12 @@ import matplotlib
 matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
 matplotlib.rcParams['axes.unicode_minus'] = False
 
+# 实体词典：统一实体注册表中带 phase2 标签的实体，按类型分组
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据清洗代码"))
+from entity_registry import load_registry
+
+ENTITIES = load_registry().grouped('phase2')
+
 def phase2_main():
     print("=" * 60)
     print("阶段二：命名实体识别与关系抽取")
@@ -18,14 +26,7 @@ def phase2_main():
     print("\n1. 📋 实体识别")
     print("-" * 40)
     
-    entities = {
-        '人物': ['哪吒', '李靖', '殷夫人', '太乙真人', '敖丙', '龙王', '申公豹',
-                '石矶娘娘', '杨戬', '雷震子', '姜子牙', '金吒', '木吒', '殷郊', '殷洪'],
-        '法宝': ['混天绫', '乾坤圈', '风火轮', '火尖枪', '九龙神火罩'],
-        '地点': ['陈塘关', '东海', '金光洞', '乾元山', '天庭'],
-        '事件': ['哪吒降生', '大闹东海', '削骨还父', '莲花化身', '助周伐纣', '封神归位'],
-        '组织': ['商朝', '周朝', '天庭', '截教', '阐教']
-    }
+    entities = ENTITIES
     
     print(f"识别到 {len(entities)} 类实体：")
     total_entities = 0
@@ -1,42 +1,62 @@
 import os
+import sys
+import argparse
+import queue
+import threading
+import multiprocessing as mp
 from snownlp import SnowNLP
-from docx import Document
-import pdfplumber
 import jieba
 from collections import Counter
+from functools import partial
+
+# 复用数据清洗阶段的提取代码与缓存
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据清洗代码"))
+from doc_extract import iter_pdf_pages, iter_docx_paragraphs, resolve_engine
+from extract_cache import ExtractCache
+from boilerplate import strip_repeated_lines
+
+extract_cache = ExtractCache()
+# PDF 提取引擎："pdfplumber"，或快速引擎 "pdfium"（异常页自动回退 pdfplumber）
+PDF_ENGINE = "pdfplumber"
+engine_stats = Counter()
+header_stats = Counter()     # 页眉页脚：删除的行数
 
 # ======================
 # 读取 Word
 # ======================
 def read_docx(path):
-    doc = Document(path)
+    paras = extract_cache.get_or_extract("docx", path, iter_docx_paragraphs)
     text = []
-    for p in doc.paragraphs:
-        if p.text.strip():
-            text.append(p.text.strip())
+    for p in paras:
+        if p.strip():
+            text.append(p.strip())
     return "\n".join(text)
 
 # ======================
 # 读取 PDF
 # ======================
-def read_pdf(path):
-    text = []
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text()
-            if t:
-                text.append(t)
+def read_pdf(path, engine=None):
+    engine = resolve_engine(engine or PDF_ENGINE)
+    extract = partial(iter_pdf_pages, engine=engine, stats=engine_stats)
+    variant = "" if engine == "pdfplumber" else engine
+    pages = extract_cache.get_or_extract("pdf", path, extract, variant)
+    text = [t for t in pages if t]
     return "\n".join(text)
 
 # ======================
 # 情感分析
 # ======================
-def sentiment_analysis(text):
-    scores = []
+def split_lines(text):
+    """取出参与情感打分的行（去空白后长度大于 5）"""
+    lines = []
     for line in text.split("\n"):
         line = line.strip()
         if len(line) > 5:
-            scores.append(SnowNLP(line).sentiments)
+            lines.append(line)
+    return lines
+
+def score_lines(lines):
+    scores = [SnowNLP(line).sentiments for line in lines]
 
     if not scores:
         return 0.5, "中性"
@@ -52,6 +72,9 @@ def sentiment_analysis(text):
 
     return avg, label
 
+def sentiment_analysis(text):
+    return score_lines(split_lines(text))
+
 # ======================
 # 关键词提取
 # ======================
@@ -61,36 +84,157 @@ def extract_keywords(text, top_n=10):
     return Counter(words).most_common(top_n)
 
 # ======================
-# 主流程
+# 流水线各阶段：提取 -> 分词 -> 情感打分
+# 每个阶段输入输出都是元组，串行模式与流水线模式共用
 # ======================
-def main():
-    base_dir = "data"
-    results = []
-
+def list_documents(base_dir):
+    items = []
     for root, _, files in os.walk(base_dir):
         for file in files:
-            path = os.path.join(root, file)
+            if file.endswith(".docx") or file.endswith(".pdf"):
+                items.append((len(items), file, os.path.join(root, file)))
+    return items
+
+def stage_extract(item):
+    idx, file, path = item
+    hits, misses = extract_cache.hits, extract_cache.misses
+    before = Counter(engine_stats)
+    text = read_docx(path) if file.endswith(".docx") else read_pdf(path)
+    # 页眉、页脚、刊名、页码行每页重复一次，会挤进关键词前列，打分前先删除（见 boilerplate.py）
+    text, n_lines = strip_repeated_lines(text)
+    header_stats["lines"] += n_lines
+    # 本阶段产生的缓存与引擎计数，流水线模式下由主进程汇总
+    counts = Counter(engine_stats)
+    counts.subtract(before)
+    counts["cache_hits"] = extract_cache.hits - hits
+    counts["cache_misses"] = extract_cache.misses - misses
+    counts["header_lines"] = n_lines
+    return idx, file, text, counts
+
+def stage_segment(item):
+    idx, file, text, counts = item
+    return idx, file, split_lines(text), extract_keywords(text, 5), counts
+
+def stage_score(item):
+    idx, file, lines, keywords, counts = item
+    score, label = score_lines(lines)
+    return idx, file, score, label, keywords, counts
+
+STAGES = [stage_extract, stage_segment, stage_score]
 
-            if file.endswith(".docx"):
-                text = read_docx(path)
-            elif file.endswith(".pdf"):
-                text = read_pdf(path)
-            else:
-                continue
+# ======================
+# 流水线：每个阶段独立的进程池，阶段之间用有界队列连接，
+# 下游处理不过来时上游阻塞在 put 上（背压）
+# ======================
+def _stage_worker(func, in_q, out_q):
+    while True:
+        item = in_q.get()
+        if item is None:
+            break
+        # 上游的异常原样向下传递，由主进程抛出，避免整条流水线卡住
+        if not isinstance(item, Exception):
+            try:
+                item = func(item)
+            except Exception as e:
+                item = RuntimeError(f"{func.__name__} 失败: {e!r}")
+        out_q.put(item)
+
+def _abort_pipeline(pools, queues):
+    """终止所有阶段进程；队列中未取走的数据直接丢弃，主进程退出时不再等待"""
+    for procs in pools:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+    for q in queues:
+        q.cancel_join_thread()
+
+def run_pipeline(items, workers, queue_size=4, poll=1.0):
+    """按 STAGES 顺序并发执行，workers 为各阶段的进程数，结果按输入顺序返回；
+    某个阶段进程异常退出（内存不足、PDF 库崩溃等，不会产生 Python 异常）时，
+    每隔 poll 秒检查一次进程状态，发现后终止整条流水线并抛出 RuntimeError"""
+    queues = [mp.Queue(maxsize=queue_size) for _ in range(len(STAGES) + 1)]
+    pools = []
+    for i, (func, n) in enumerate(zip(STAGES, workers)):
+        procs = [mp.Process(target=_stage_worker, args=(func, queues[i], queues[i + 1]), daemon=True)
+                 for _ in range(n)]
+        for p in procs:
+            p.start()
+        pools.append(procs)
+
+    def feed():
+        for item in items:
+            queues[0].put(item)
+        # 每个阶段结束后通知下一阶段的所有进程退出
+        for i, procs in enumerate(pools):
+            for _ in procs:
+                queues[i].put(None)
+            for p in procs:
+                p.join()
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    results = []
+    while len(results) < len(items):
+        try:
+            results.append(queues[-1].get(timeout=poll))
+        except queue.Empty:
+            dead = [(func.__name__, p) for func, procs in zip(STAGES, pools)
+                    for p in procs if p.exitcode not in (None, 0)]
+            if dead:
+                _abort_pipeline(pools, queues)
+                name, p = dead[0]
+                raise RuntimeError(f"{name} 进程 {p.pid} 异常退出（exitcode={p.exitcode}），流水线已终止")
+    feeder.join()
+    for r in results:
+        if isinstance(r, Exception):
+            raise r
+    return sorted(results, key=lambda r: r[0])
 
-            score, label = sentiment_analysis(text)
-            keywords = extract_keywords(text, 5)
+# ======================
+# 主流程
+# ======================
+def main():
+    parser = argparse.ArgumentParser(description="PDF / Word 情感分析")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="提取、分词、情感打分三个阶段流水线并发执行")
+    parser.add_argument("--workers", type=int, nargs=3, default=[2, 1, 2],
+                        metavar=("EXTRACT", "SEGMENT", "SCORE"),
+                        help="流水线模式下各阶段的进程数")
+    parser.add_argument("--queue-size", type=int, default=4, help="阶段之间队列的容量")
+    args = parser.parse_args()
 
-            results.append((file, score, label, keywords))
+    base_dir = "data"
+    items = list_documents(base_dir)
+
+    if args.pipeline:
+        results = run_pipeline(items, args.workers, args.queue_size)
+        for r in results:
+            counts = r[5]
+            extract_cache.hits += counts.pop("cache_hits")
+            extract_cache.misses += counts.pop("cache_misses")
+            header_stats["lines"] += counts.pop("header_lines")
+            engine_stats.update(counts)
+    else:
+        results = []
+        for item in items:
+            for stage in STAGES:
+                item = stage(item)
+            results.append(item)
 
     print("=" * 60)
     print("PDF / Word 情感分析结果")
     print("=" * 60)
 
-    for r in results:
-        print(f"\n文件名：{r[0]}")
-        print(f"情感倾向：{r[2]}（得分 {r[1]:.3f}）")
-        print("关键词：", ", ".join([k for k, _ in r[3]]))
+    for _, file, score, label, keywords, _ in results:
+        print(f"\n文件名：{file}")
+        print(f"情感倾向：{label}（得分 {score:.3f}）")
+        print("关键词：", ", ".join([k for k, _ in keywords]))
+
+    print()
+    if +engine_stats:
+        print("PDF 页面提取引擎：" + "，".join(f"{k} {v} 页" for k, v in sorted((+engine_stats).items())))
+    print(f"页眉页脚：删除 {header_stats['lines']} 行")
+    extract_cache.report()
 
 if __name__ == "__main__":
     main()
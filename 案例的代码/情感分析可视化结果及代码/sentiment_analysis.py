@@ -1,16 +1,15 @@
+import os
+import sys
 import json
+import argparse
 
-# 读取哪吒
-with open("nezha_processed.json", encoding="utf-8") as f:
-    nezha_data = json.load(f)
+# 字幕时间索引、多部影片批处理（数据清洗阶段的 subtitle_index.py / film_batch.py）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "数据清洗代码"))
+from subtitle_index import SubtitleIndex
+from film_batch import list_films, run_batch
 
-# 读取封神
-with open("fengshen_processed.json", encoding="utf-8") as f:
-    fengshen_data = json.load(f)
-
-print("哪吒字幕条数：", len(nezha_data["cleaned"]))
-print("封神字幕条数：", len(fengshen_data["cleaned"]))
 from snownlp import SnowNLP
+from sentiment_arc import sentiment_arc, banded_dtw, aligned_segments
 
 def sentiment_scores(texts):
     scores = []
@@ -20,19 +19,97 @@ def sentiment_scores(texts):
             scores.append(s.sentiments)
     return scores
 
-nezha_scores = sentiment_scores(nezha_data["cleaned"])
-fengshen_scores = sentiment_scores(fengshen_data["cleaned"])
-
-print("哪吒情感样例：", nezha_scores[:5])
-print("封神情感样例：", fengshen_scores[:5])
 def classify(scores):
     pos = sum(1 for s in scores if s > 0.6)
     neu = sum(1 for s in scores if 0.4 <= s <= 0.6)
     neg = sum(1 for s in scores if s < 0.4)
     return pos, neu, neg
 
-nezha_dist = classify(nezha_scores)
-fengshen_dist = classify(fengshen_scores)
+# 按时间窗口统计情感走势（需要 ass_parser.py 生成的带 start/end 的 processed.json）
+def window_sentiment(index, line_scores, start, end):
+    """与 [start, end] 重叠的对白的平均情感得分，line_scores 与 index.texts 一一对应"""
+    ids = index.overlapping_ids(start, end)
+    if not ids:
+        return None
+    return sum(line_scores[i] for i in ids) / len(ids)
+
+def film_sentiment(name, path, output_dir, window=300):
+    """单部影片（.ass 或 processed.json）：逐句打分，写出 <影片名>_sentiment.json
+    （情感分布、每句得分、每 window 秒的平均情感），返回汇总行"""
+    index = SubtitleIndex.load(path)
+    scores = sentiment_scores(index.texts)
+    pos, neu, neg = classify(scores)
+    windows = []
+    for t, _ in index.windows(window):
+        avg = window_sentiment(index, scores, t, t + window)
+        if avg is not None:
+            windows.append({"start": t, "mean": round(avg, 4)})
+    result = {"film": name, "distribution": {"正": pos, "中": neu, "负": neg},
+              "start": list(index.starts), "scores": scores, "windows": windows}
+    with open(os.path.join(output_dir, f"{name}_sentiment.json"), "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+    total = len(scores) or 1
+    return {"字幕条数": len(scores), "正面": pos, "中性": neu, "负面": neg,
+            "正面占比": round(pos / total, 3), "负面占比": round(neg / total, 3),
+            "平均情感": round(sum(scores) / total, 4)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="字幕情感分析")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="批处理目录下所有 .ass 字幕，每部影片一个工作进程")
+    parser.add_argument("-o", "--output-dir", default="sentiment", help="批处理输出目录")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认为 CPU 核数")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(list_films(args.batch), film_sentiment, args.output_dir, args.workers,
+                  "sentiment_summary.csv")
+        sys.exit()
+
+    # 读取哪吒
+    with open("nezha_processed.json", encoding="utf-8") as f:
+        nezha_data = json.load(f)
+
+    # 读取封神
+    with open("fengshen_processed.json", encoding="utf-8") as f:
+        fengshen_data = json.load(f)
+
+    print("哪吒字幕条数：", len(nezha_data["cleaned"]))
+    print("封神字幕条数：", len(fengshen_data["cleaned"]))
+
+    nezha_scores = sentiment_scores(nezha_data["cleaned"])
+    fengshen_scores = sentiment_scores(fengshen_data["cleaned"])
+
+    print("哪吒情感样例：", nezha_scores[:5])
+    print("封神情感样例：", fengshen_scores[:5])
+
+    nezha_dist = classify(nezha_scores)
+    fengshen_dist = classify(fengshen_scores)
+
+    print("哪吒 情感分布（正 中 负）：", nezha_dist)
+    print("封神 情感分布（正 中 负）：", fengshen_dist)
+
+    for name, data, scores in [("哪吒", nezha_data, nezha_scores), ("封神", fengshen_data, fengshen_scores)]:
+        if "start" not in data:
+            continue
+        index = SubtitleIndex(zip(data["start"], data["end"], data["cleaned"]))
+        # 复用上面算好的得分，按索引中的对白顺序重新对齐
+        score_of = dict(zip([t for t in data["cleaned"] if t.strip()], scores))
+        line_scores = [score_of[t] for t in index.texts]
+        print(f"{name} 每 5 分钟平均情感：")
+        for t, _ in index.windows(300):
+            avg = window_sentiment(index, line_scores, t, t + 300)
+            if avg is not None:
+                print(f"  {int(t // 60):3d} 分钟起：{avg:.3f}")
 
-print("哪吒 情感分布（正 中 负）：", nezha_dist)
-print("封神 情感分布（正 中 负）：", fengshen_dist)
+    # 情感走势对齐（带约束带的 DTW，按分钟分箱）
+    if "start" in nezha_data and "start" in fengshen_data:
+        arcs = []
+        for data, scores in [(nezha_data, nezha_scores), (fengshen_data, fengshen_scores)]:
+            starts = [t for t, text in zip(data["start"], data["cleaned"]) if text.strip()]
+            arcs.append(sentiment_arc(starts, scores))
+        distance, path = banded_dtw(*arcs)
+        print(f"哪吒 vs 封神 情感走势 DTW 距离：{distance:.3f}（归一化 {distance / sum(map(len, arcs)):.4f}）")
+        for seg in aligned_segments(*arcs, path):
+            print(f"  {seg['类型']}：哪吒 {seg['A 开始'] // 60}-{seg['A 结束'] // 60} 分钟 ↔ "
+                  f"封神 {seg['B 开始'] // 60}-{seg['B 结束'] // 60} 分钟，平均差 {seg['平均差']}")
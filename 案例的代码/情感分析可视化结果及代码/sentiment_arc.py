@@ -0,0 +1,192 @@
+"""
+影片情感走势比较
+把逐句情感得分按时间分箱成情感曲线（每箱取平均，空箱按相邻箱线性插值），
+再用带 Sakoe-Chiba 约束带的 DTW 对齐两部影片的曲线：
+同一条反对角线上的格子互不依赖，按反对角线逐条用 NumPy 整体计算，不逐格循环；
+多部影片两两比较时，多对曲线再叠成一批同时推进
+
+用法：python sentiment_arc.py a_sentiment.json b_sentiment.json ... [--bin 60] [--band 0.1]
+（输入为 sentiment_analysis.py --batch 生成的 *_sentiment.json）
+两部影片时输出对齐片段，多部影片时输出两两距离矩阵
+"""
+
+import os
+import json
+import argparse
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+
+# ======================
+# 情感曲线
+# ======================
+def sentiment_arc(starts, scores, bin_seconds=60, duration=None, normalize=False):
+    """starts: 每句开始秒；scores: 对应情感得分 -> 每 bin_seconds 秒的平均得分数组
+    normalize=True 时做 z 标准化，只比较走势形状、不比较整体基调"""
+    starts = np.asarray(starts, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    if duration is None:
+        duration = starts.max() if len(starts) else 0.0
+    n_bins = int(duration // bin_seconds) + 1
+    bins = np.minimum((starts // bin_seconds).astype(np.int64), n_bins - 1)
+    sums = np.bincount(bins, scores, minlength=n_bins)
+    counts = np.bincount(bins, minlength=n_bins)
+    filled = counts > 0
+    if not filled.any():
+        return np.full(n_bins, 0.5)
+    arc = np.interp(np.arange(n_bins), np.flatnonzero(filled), sums[filled] / counts[filled])
+    if normalize:
+        arc = (arc - arc.mean()) / (arc.std() or 1.0)
+    return arc
+
+
+def load_arc(path, bin_seconds=60, normalize=False):
+    """读取 *_sentiment.json，返回 (影片名, 情感曲线)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["film"], sentiment_arc(data["start"], data["scores"], bin_seconds,
+                                       normalize=normalize)
+
+
+# ======================
+# 带约束带的 DTW
+# ======================
+def band_radius(n, m, band):
+    """约束带半宽（以 B 的箱数计），至少保证相邻两行的约束带相接"""
+    return np.maximum(np.maximum(band * np.maximum(n, m), (m - 1) / np.maximum(n - 1, 1)), 1.0)
+
+
+def banded_dtw(a, b, band=0.1):
+    """返回 (累计距离, 对齐路径 [(i, j), ...])
+    band: 约束带半宽，占较长曲线长度的比例；格子 (i, j) 只有在 j 与 i 按长度比例
+    对应的位置相差不超过半宽时才参与计算（半宽至少保证约束带连通）"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    n, m = len(a), len(b)
+    radius = band_radius(n, m, band)
+    slope = (m - 1) / max(n - 1, 1)
+
+    # 在展平的 (n+1) x (m+1) 矩阵上用一维下标取前驱，减少每条反对角线上的开销
+    width = m + 1
+    D = np.full((n + 1) * width, np.inf)
+    D[0] = 0.0
+    cost = np.abs(a[:, None] - b[None, :]).ravel()
+    for s in range(2, n + m + 1):
+        i = np.arange(max(1, s - m), min(n, s - 1) + 1)
+        # 约束带沿 (1,1)-(n,m) 的对角线
+        i = i[np.abs(s - i - 1 - (i - 1) * slope) <= radius]
+        if not len(i):
+            continue
+        j = s - i
+        at = i * width + j
+        best = np.minimum(np.minimum(D[at - width - 1], D[at - width]), D[at - 1])
+        D[at] = cost[(i - 1) * m + j - 1] + best
+    D = D.reshape(n + 1, width)
+
+    # 回溯
+    path = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        step = np.argmin((D[i - 1, j - 1], D[i - 1, j], D[i, j - 1]))
+        if step == 0:
+            i, j = i - 1, j - 1
+        elif step == 1:
+            i -= 1
+        else:
+            j -= 1
+    path.reverse()
+    return D[n, m], path
+
+
+def aligned_segments(a, b, path, bin_seconds=60):
+    """把对齐路径按走法合并成片段：同步（1:1）、A 拉长（A 多箱对应 B 一箱）、B 拉长
+    每段给出两部影片的起止时间（秒）与平均得分差"""
+    kinds = ["同步"]
+    for (i0, j0), (i1, j1) in zip(path, path[1:]):
+        kinds.append("同步" if i1 > i0 and j1 > j0 else "A 拉长" if i1 > i0 else "B 拉长")
+
+    segments = []
+    start = 0
+    for k in range(1, len(path) + 1):
+        if k == len(path) or kinds[k] != kinds[start]:
+            cells = path[start:k]
+            ia = [c[0] for c in cells]
+            jb = [c[1] for c in cells]
+            segments.append({
+                "类型": kinds[start],
+                "A 开始": ia[0] * bin_seconds, "A 结束": (ia[-1] + 1) * bin_seconds,
+                "B 开始": jb[0] * bin_seconds, "B 结束": (jb[-1] + 1) * bin_seconds,
+                "平均差": round(float(np.mean(np.abs(a[ia] - b[jb]))), 4),
+            })
+            start = k
+    return segments
+
+
+def dtw_distances(pairs, band=0.1, chunk=128):
+    """批量计算多对曲线的 DTW 距离（不回溯路径），返回按 n + m 归一化的距离数组
+    pairs: [(a, b), ...]；每批 chunk 对补齐到相同长度后一起按反对角线推进，
+    反对角线循环次数只取决于最长的曲线，而不是曲线对数"""
+    out = np.empty(len(pairs))
+    for k in range(0, len(pairs), chunk):
+        batch = pairs[k:k + chunk]
+        n = np.array([len(a) for a, _ in batch])
+        m = np.array([len(b) for _, b in batch])
+        N, M = n.max(), m.max()
+        A = np.zeros((len(batch), N))
+        B = np.zeros((len(batch), M))
+        for p, (a, b) in enumerate(batch):
+            A[p, :len(a)] = a
+            B[p, :len(b)] = b
+        radius = band_radius(n, m, band)[:, None]
+        slope = ((m - 1) / np.maximum(n - 1, 1))[:, None]
+
+        D = np.full((len(batch), N + 1, M + 1), np.inf)
+        D[:, 0, 0] = 0.0
+        for s in range(2, N + M + 1):
+            i = np.arange(max(1, s - M), min(N, s - 1) + 1)
+            j = s - i
+            valid = ((i <= n[:, None]) & (j <= m[:, None])
+                     & (np.abs(j - 1 - (i - 1) * slope) <= radius))
+            best = np.minimum(np.minimum(D[:, i - 1, j - 1], D[:, i - 1, j]), D[:, i, j - 1])
+            D[:, i, j] = np.where(valid, np.abs(A[:, i - 1] - B[:, j - 1]) + best, np.inf)
+        out[k:k + len(batch)] = D[np.arange(len(batch)), n, m] / (n + m)
+    return out
+
+
+def pairwise_distances(arcs, band=0.1):
+    """arcs: {影片名: 曲线} -> 两两 DTW 距离表（按 n + m 归一化）"""
+    names = list(arcs)
+    pairs = list(combinations(range(len(names)), 2))
+    dist = np.zeros((len(names), len(names)))
+    if pairs:
+        d = dtw_distances([(arcs[names[x]], arcs[names[y]]) for x, y in pairs], band)
+        rows, cols = np.array(pairs).T
+        dist[rows, cols] = dist[cols, rows] = d
+    return pd.DataFrame(dist, index=names, columns=names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="影片情感走势 DTW 比较")
+    parser.add_argument("paths", nargs="+", help="*_sentiment.json")
+    parser.add_argument("--bin", type=int, default=60, help="分箱时长（秒）")
+    parser.add_argument("--band", type=float, default=0.1, help="约束带半宽（占曲线长度的比例）")
+    parser.add_argument("--normalize", action="store_true", help="z 标准化，只比较走势形状")
+    parser.add_argument("-o", "--output", default="sentiment_dtw.csv", help="输出表格")
+    args = parser.parse_args()
+
+    arcs = dict(load_arc(p, args.bin, args.normalize) for p in args.paths)
+    if len(arcs) == 2:
+        (x, a), (y, b) = arcs.items()
+        d, path = banded_dtw(a, b, args.band)
+        print(f"{x} vs {y}：DTW 距离 {d:.3f}（路径长度 {len(path)}，"
+              f"归一化 {d / (len(a) + len(b)):.4f}）")
+        table = pd.DataFrame(aligned_segments(a, b, path, args.bin))
+        print(table.to_string(index=False))
+    else:
+        table = pairwise_distances(arcs, args.band)
+        print(table.round(4).to_string())
+    table.to_csv(args.output, index=len(arcs) != 2, encoding="utf-8-sig")
+    print(f"结果已保存到: {os.path.abspath(args.output)}")
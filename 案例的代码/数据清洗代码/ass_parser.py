@@ -0,0 +1,131 @@
+"""
+ASS 字幕解析
+读取 .ass 字幕的 [Events] 段，去掉 {\\1c&H..\\fnKaiTi} 之类的特效标签，
+保留每条对白的开始/结束时间，生成 电影字幕clean_script.py 和 sentiment_analysis.py
+所需的 *_processed.json（cleaned 字段为清洗后的对白列表）
+
+用法：python ass_parser.py 字幕1.ass 字幕2.ass ... [-o 输出目录]
+"""
+
+import os
+import re
+import json
+import codecs
+import argparse
+
+# 特效标签 {...} 与换行/硬空格转义，一次扫描全部处理
+TOKEN = re.compile(r"\{[^{}]*\}|\\[Nnh]")
+TIMESTAMP = re.compile(r"(\d+):(\d{1,2}):(\d{1,2})(?:[.:](\d{1,3}))?")
+
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+# ======================
+# 编码识别
+# ======================
+def detect_encoding(path, sample_size=1 << 16):
+    """依次根据 BOM、UTF-8 试解码判断编码，都不符合时按 GBK（GB18030）处理"""
+    with open(path, "rb") as f:
+        head = f.read(sample_size)
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        head.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # 采样截断在多字节字符中间时不算失败
+        if e.start >= len(head) - 3 and len(head) == sample_size:
+            return "utf-8"
+    return "gb18030"
+
+
+# ======================
+# 解析
+# ======================
+def parse_timestamp(ts):
+    """H:MM:SS.cc -> 秒"""
+    m = TIMESTAMP.match(ts.strip())
+    if not m:
+        raise ValueError(f"无法解析的时间戳: {ts!r}")
+    h, mnt, sec, frac = m.groups()
+    seconds = int(h) * 3600 + int(mnt) * 60 + int(sec)
+    if frac:
+        seconds += int(frac) / (10 ** len(frac))
+    return seconds
+
+
+def clean_text(text):
+    """去掉特效标签，换行转义替换为空格，合并多余空白"""
+    return " ".join(TOKEN.sub(lambda m: "" if m.group().startswith("{") else " ", text).split())
+
+
+def iter_dialogues(path):
+    """逐条产出 (开始秒, 结束秒, 清洗后的文本)，跳过清洗后为空的对白"""
+    with open(path, encoding=detect_encoding(path), errors="replace") as f:
+        in_events = False
+        fields = None
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                in_events = line.lower() == "[events]"
+                continue
+            if not in_events:
+                continue
+            if line.startswith("Format:"):
+                fields = [x.strip().lower() for x in line[len("Format:"):].split(",")]
+                continue
+            if not line.startswith("Dialogue:"):
+                continue
+            if fields is None:
+                # 缺少 Format 行时使用 ASS v4+ 的默认字段顺序
+                fields = ["layer", "start", "end", "style", "name",
+                          "marginl", "marginr", "marginv", "effect", "text"]
+            values = line[len("Dialogue:"):].split(",", len(fields) - 1)
+            if len(values) < len(fields):
+                continue
+            row = dict(zip(fields, values))
+            text = clean_text(row["text"])
+            if text:
+                yield parse_timestamp(row["start"]), parse_timestamp(row["end"]), text
+
+
+def parse_ass(path):
+    """解析一部影片的字幕，返回 processed.json 的内容"""
+    data = {"source": os.path.basename(path), "cleaned": [], "start": [], "end": []}
+    for start, end, text in iter_dialogues(path):
+        data["cleaned"].append(text)
+        data["start"].append(round(start, 3))
+        data["end"].append(round(end, 3))
+    return data
+
+
+def processed_name(path):
+    """nezha.ass -> nezha_processed.json"""
+    return os.path.splitext(os.path.basename(path))[0] + "_processed.json"
+
+
+def convert_batch(paths, output_dir="."):
+    """批量转换多部影片的字幕，返回生成的 json 路径列表"""
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = []
+    for path in paths:
+        data = parse_ass(path)
+        out_path = os.path.join(output_dir, processed_name(path))
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        print(f"{os.path.basename(path)} -> {out_path}（{len(data['cleaned'])} 条对白）")
+        outputs.append(out_path)
+    return outputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ASS 字幕转 *_processed.json")
+    parser.add_argument("paths", nargs="+", help=".ass 字幕文件")
+    parser.add_argument("-o", "--output-dir", default=".", help="输出目录")
+    args = parser.parse_args()
+    convert_batch(args.paths, args.output_dir)
@@ -0,0 +1,112 @@
+"""
+模板文本清理
+1. 单篇文档内反复出现的短行（页眉、页脚、刊名、页码行）直接删除
+2. 全语料范围内用 MinHash/LSH 找近似重复的段落，只保留第一次出现的
+   每个段落只和落入同一 LSH 桶的候选比较，总耗时随段落数近似线性增长
+"""
+
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+# ======================
+# 页眉页脚
+# ======================
+HEADER_MAX_CHARS = 80     # 页眉页脚行（去空白后）的最大长度
+HEADER_MIN_CHARS = 4      # 太短的行（如单独的人名、序号）不处理
+HEADER_MIN_REPEATS = 3    # 同一篇文档内至少出现几次才视为页眉页脚
+
+DIGITS = re.compile(r"\d+")
+
+
+def line_signature(line):
+    """去掉空白、把数字统一替换，使“第3页”“第4页”这类页码行归为一类"""
+    return DIGITS.sub("#", "".join(line.split()))
+
+
+def kept_line_numbers(lines, min_repeats=HEADER_MIN_REPEATS):
+    """返回不属于页眉页脚的行号列表"""
+    sigs = [line_signature(line) for line in lines]
+    counts = Counter(sig for sig in sigs
+                     if HEADER_MIN_CHARS <= len(sig) <= HEADER_MAX_CHARS)
+    repeated = {sig for sig, n in counts.items() if n >= min_repeats}
+    return [i for i, sig in enumerate(sigs) if sig not in repeated]
+
+
+def strip_repeated_lines(text, min_repeats=HEADER_MIN_REPEATS):
+    """删除文档内重复出现的页眉页脚行，返回 (清理后的文本, 删除的行数)"""
+    lines = text.split("\n")
+    kept = kept_line_numbers(lines, min_repeats)
+    if len(kept) == len(lines):
+        return text, 0
+    return "\n".join(lines[i] for i in kept), len(lines) - len(kept)
+
+
+# ======================
+# MinHash / LSH 近似重复段落
+# ======================
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+class NearDuplicateFilter:
+    def __init__(self, num_perm=64, bands=8, threshold=0.8, shingle=3,
+                 min_chars=30, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle = shingle
+        self.min_chars = min_chars
+        # 决定签名的参数，签名缓存以此为键（threshold、bands 只影响比较，不影响签名）
+        self.params = (num_perm, shingle, min_chars, seed)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._buckets = [dict() for _ in range(bands)]   # 桶键 -> 该桶内已保留段落的编号列表
+        self._signatures = []                            # 已保留段落的签名
+        self.checked = 0
+        self.duplicates = 0
+
+    def _shingle_hashes(self, chars):
+        k = self.shingle
+        grams = {chars[i:i + k] for i in range(max(1, len(chars) - k + 1))}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams),
+                           dtype=np.uint64, count=len(grams))
+
+    def signature(self, chars):
+        x = self._shingle_hashes(chars)
+        # (a * x + b) mod p 在 uint64 上会溢出回绕，这里与常见实现一样只取低 32 位，
+        # 仍然是一族足够独立的哈希函数
+        phv = ((x[None, :] * self._a[:, None] + self._b[:, None]) % MERSENNE_PRIME) & MAX_HASH
+        return phv.min(axis=1).astype(np.uint32)
+
+    def is_duplicate(self, para):
+        """段落与之前见过的某个段落近似重复时返回 True，否则记录该段落并返回 False"""
+        chars = "".join(para.split())
+        if len(chars) < self.min_chars:
+            return False
+        return self.is_duplicate_signature(self.signature(chars))
+
+    def is_duplicate_signature(self, sig):
+        """同 is_duplicate，签名已事先算好（如来自缓存）"""
+        self.checked += 1
+        keys = [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+        # 与所有至少在一个桶中相撞的已保留段落逐一比较，而不只是每个桶的第一个段落
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for other in candidates:
+            if np.mean(self._signatures[other] == sig) >= self.threshold:
+                self.duplicates += 1
+                return True
+
+        idx = len(self._signatures)
+        self._signatures.append(sig)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(idx)
+        return False
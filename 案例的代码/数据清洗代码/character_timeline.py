@@ -0,0 +1,159 @@
+"""
+人物台词时间轴
+对每部影片，把人物名映射到其在字幕中被提及的时间（对白开始秒，一次提及记一条，已排序），
+所有人物的时间连续存放在一个 array("d") 中，offsets[i]:offsets[i+1] 为第 i 个人物的区间，
+查询都在该区间内二分完成，不再逐行扫描字幕：
+  count_between(名字, a, b)  [a, b) 内的提及次数
+  per_minute(名字)           每分钟提及次数
+  first_appearance / last_appearance
+  co_presence(甲, 乙, N)     甲、乙相隔不超过 N 秒的提及
+人物名默认取统一实体注册表（entity_registry.py）中的全部人物
+
+用法：python character_timeline.py 字幕1.ass ... [-o 输出目录]  生成 <影片名>_timeline.bin
+"""
+
+import os
+import struct
+import argparse
+from array import array
+from bisect import bisect_left, bisect_right
+
+from entity_registry import load_registry
+from subtitle_index import SubtitleIndex, to_seconds
+
+MAGIC = b"NZTIME01"
+HEADER = struct.Struct("<8sIIId")       # magic, 人物数, 提及总数, 人物名字节数, 影片时长
+
+
+def default_characters():
+    """注册表中的全部人物（按编号）"""
+    return load_registry().names("人物")
+
+
+class CharacterTimeline:
+    def __init__(self, names, offsets, times, duration=0.0):
+        self.names = list(names)
+        self.offsets = offsets      # array("q")，长度为人物数 + 1
+        self.times = times          # array("d")
+        self.duration = duration
+        self._pos = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def build(cls, index, names):
+        """index: SubtitleIndex（对白已按开始时间排序）"""
+        per_name = [array("d") for _ in names]
+        for start, text in zip(index.starts, index.texts):
+            for i, name in enumerate(names):
+                n = text.count(name)
+                if n:
+                    per_name[i].extend([start] * n)
+        offsets, times = array("q", [0]), array("d")
+        for mentions in per_name:
+            times.extend(mentions)
+            offsets.append(len(times))
+        return cls(names, offsets, times, index.duration)
+
+    @classmethod
+    def from_subtitles(cls, path, names=None):
+        """path 为 .ass 或带时间轴的 processed.json"""
+        return cls.build(SubtitleIndex.load(path), names or default_characters())
+
+    # ---------- 持久化 ----------
+    def save(self, path):
+        names = "\n".join(self.names).encode("utf-8")
+        with open(path + ".tmp", "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.names), len(self.times), len(names), self.duration))
+            f.write(names)
+            self.offsets.tofile(f)
+            self.times.tofile(f)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            magic, n_names, n_times, names_len, duration = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"不是人物时间轴文件: {path}")
+            names = f.read(names_len).decode("utf-8").split("\n") if n_names else []
+            offsets, times = array("q"), array("d")
+            offsets.fromfile(f, n_names + 1)
+            times.fromfile(f, n_times)
+        return cls(names, offsets, times, duration)
+
+    # ---------- 查询 ----------
+    def _span(self, name):
+        i = self._pos[name]
+        return self.offsets[i], self.offsets[i + 1]
+
+    def mentions(self, name):
+        lo, hi = self._span(name)
+        return self.times[lo:hi]
+
+    def count(self, name):
+        lo, hi = self._span(name)
+        return hi - lo
+
+    def count_between(self, name, a, b):
+        lo, hi = self._span(name)
+        return (bisect_left(self.times, to_seconds(b), lo, hi)
+                - bisect_left(self.times, to_seconds(a), lo, hi))
+
+    def first_appearance(self, name):
+        lo, hi = self._span(name)
+        return self.times[lo] if hi > lo else None
+
+    def last_appearance(self, name):
+        lo, hi = self._span(name)
+        return self.times[hi - 1] if hi > lo else None
+
+    def per_minute(self, name, minutes=1):
+        """从 0 秒起每 minutes 分钟一格的提及次数，覆盖整部影片"""
+        size = minutes * 60
+        n_bins = int(self.duration // size) + 1
+        lo, hi = self._span(name)
+        counts = []
+        for k in range(n_bins):
+            end = bisect_left(self.times, (k + 1) * size, lo, hi)
+            counts.append(end - lo)
+            lo = end
+        return counts
+
+    def co_presence(self, a, b, within):
+        """甲的每次提及前后 within 秒内有乙的提及，即记一条 (甲的时间, 最近的乙的时间)"""
+        lo_b, hi_b = self._span(b)
+        pairs = []
+        for t in self.mentions(a):
+            lo = bisect_left(self.times, t - within, lo_b, hi_b)
+            hi = bisect_right(self.times, t + within, lo_b, hi_b)
+            if hi > lo:
+                nearest = min(self.times[lo:hi], key=lambda s: abs(s - t))
+                pairs.append((t, nearest))
+        return pairs
+
+
+def timeline_name(path):
+    """nezha.ass -> nezha_timeline.bin"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    if name.endswith("_processed"):
+        name = name[:-len("_processed")]
+    return name + "_timeline.bin"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="字幕人物时间轴")
+    parser.add_argument("paths", nargs="+", help=".ass 字幕或带时间轴的 processed.json")
+    parser.add_argument("-o", "--output-dir", default=".", help="输出目录")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    names = default_characters()
+    for path in args.paths:
+        timeline = CharacterTimeline.from_subtitles(path, names)
+        out_path = os.path.join(args.output_dir, timeline_name(path))
+        timeline.save(out_path)
+        print(f"{os.path.basename(path)} -> {out_path}")
+        for name in names:
+            if timeline.count(name):
+                print(f"  {name}: {timeline.count(name)} 次，"
+                      f"首次 {timeline.first_appearance(name):.1f} 秒，"
+                      f"末次 {timeline.last_appearance(name):.1f} 秒")
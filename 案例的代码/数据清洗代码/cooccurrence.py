@@ -0,0 +1,144 @@
+"""
+共现统计
+把词映射为整数 id，按行批量生成词对，一次性累加进稀疏矩阵；
+只在最后把权重达到阈值的边转成 networkx 图
+"""
+
+from collections import deque
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+
+# 一批最多生成的词对数，超过后先合并进结果矩阵
+MAX_BATCH_PAIRS = 5_000_000
+
+
+def build_vocab(texts):
+    """按首次出现顺序给每个词分配 id，返回 (词 -> id 字典, id -> 词列表)"""
+    vocab = {}
+    for words in texts:
+        for w in words:
+            if w not in vocab:
+                vocab[w] = len(vocab)
+    return vocab, list(vocab)
+
+
+def encode(texts, vocab):
+    """把每行词序列转成 id 数组；不在词表中的词丢弃"""
+    encoded = []
+    for words in texts:
+        ids = [vocab[w] for w in words if w in vocab]
+        encoded.append(np.array(ids, dtype=np.int64))
+    return encoded
+
+
+class PairAccumulator:
+    """分批累加 (行, 列, 权重)，每攒够 batch_pairs 个词对就合并进结果矩阵，限制中间数组的内存"""
+
+    def __init__(self, dtype=np.int64, batch_pairs=MAX_BATCH_PAIRS):
+        self.dtype = dtype
+        self.batch_pairs = batch_pairs
+        self.total = sparse.csr_matrix((0, 0), dtype=dtype)
+        self._rows, self._cols, self._data = [], [], []
+        self._pending = 0
+
+    def add(self, r, c, weight=1):
+        """加入一批词对；按 (较小 id, 较大 id) 存放，只用上三角"""
+        self._rows.append(np.minimum(r, c))
+        self._cols.append(np.maximum(r, c))
+        self._data.append(np.full(len(r), weight, dtype=self.dtype))
+        self._pending += len(r)
+        if self._pending >= self.batch_pairs:
+            self._merge()
+
+    def _merge(self):
+        if not self._rows:
+            return
+        r = np.concatenate(self._rows)
+        c = np.concatenate(self._cols)
+        n = max(self.total.shape[0], int(max(r.max(), c.max())) + 1)
+        self.total.resize((n, n))
+        # 转 CSR 时重复坐标自动求和
+        self.total = self.total + sparse.coo_matrix(
+            (np.concatenate(self._data), (r, c)), shape=(n, n)).tocsr()
+        self._rows, self._cols, self._data = [], [], []
+        self._pending = 0
+
+    def result(self, n_vocab):
+        self._merge()
+        self.total.resize((n_vocab, n_vocab))
+        return self.total
+
+
+def pair_counts(encoded, n_vocab, batch_pairs=MAX_BATCH_PAIRS):
+    """统计同一行内所有 i < j 的词对（与 build_graph 原来的双重循环一致），
+    返回上三角 CSR 矩阵，matrix[a, b]（a <= b）为词对出现次数"""
+    by_len = {}
+    for ids in encoded:
+        if len(ids) > 1:
+            by_len.setdefault(len(ids), []).append(ids)
+
+    acc = PairAccumulator(np.int64, batch_pairs)
+    for length, lines in by_len.items():
+        iu, ju = np.triu_indices(length, 1)
+        step = max(1, batch_pairs // len(iu))
+        for k in range(0, len(lines), step):
+            block = np.vstack(lines[k:k + step])    # 同长度的行叠成一个矩阵
+            acc.add(block[:, iu].ravel(), block[:, ju].ravel())
+    return acc.result(n_vocab)
+
+
+def cooccurrence_matrix(texts, vocab=None):
+    """返回 (共现矩阵, id -> 词列表)；可传入固定词表，便于多部影片对齐"""
+    if vocab is None:
+        vocab, words = build_vocab(texts)
+    else:
+        words = sorted(vocab, key=vocab.get)
+    return pair_counts(encode(texts, vocab), len(words)), words
+
+
+def window_cooccurrence(events, window, unit="lines", decay=1.0, vocab=None):
+    """跨行滑动窗口共现，单次遍历字幕流
+    events: 按时间顺序的 (开始秒, 词序列)
+    window: 窗口大小，unit="lines" 时为相隔的行数，unit="seconds" 时为开始时间之差
+    decay:  距离衰减系数，相隔 d（行或秒）的词对权重为 decay ** d，1.0 表示不衰减
+    同一行内的词对权重为 1，与 build_graph 一致；window=0 时结果与 cooccurrence_matrix 相同
+    内存只与窗口内的行数有关；返回 (共现矩阵, id -> 词列表)"""
+    if unit not in ("lines", "seconds"):
+        raise ValueError("unit 只能是 'lines' 或 'seconds'")
+    vocab = {} if vocab is None else dict(vocab)
+    recent = deque()    # 窗口内的 (位置, id 数组)
+    triu = {}           # 行长度 -> 上三角下标，避免重复计算
+    acc = PairAccumulator(np.float64)
+
+    for n, (start, words) in enumerate(events):
+        pos = n if unit == "lines" else float(start)
+        ids = np.array([vocab.setdefault(w, len(vocab)) for w in words], dtype=np.int64)
+        while recent and pos - recent[0][0] > window:
+            recent.popleft()
+
+        if len(ids) > 1:
+            if len(ids) not in triu:
+                triu[len(ids)] = np.triu_indices(len(ids), 1)
+            iu, ju = triu[len(ids)]
+            acc.add(ids[iu], ids[ju])
+        if len(ids):
+            for prev_pos, prev in recent:
+                acc.add(np.repeat(prev, len(ids)), np.tile(ids, len(prev)),
+                        decay ** (pos - prev_pos))
+            recent.append((pos, ids))
+
+    words = sorted(vocab, key=vocab.get)
+    return acc.result(len(words)), words
+
+
+def matrix_to_graph(matrix, words, min_weight=1):
+    """只把权重 >= min_weight 的边加入图"""
+    coo = matrix.tocoo()
+    keep = coo.data >= min_weight
+    G = nx.Graph()
+    G.add_weighted_edges_from(
+        (words[r], words[c], w.item())
+        for r, c, w in zip(coo.row[keep], coo.col[keep], coo.data[keep]))
+    return G
@@ -0,0 +1,148 @@
+"""
+语料库存储：一个连续的文本文件 + 一个二进制偏移索引
+  corpus.txt  所有文档按顺序拼接（UTF-8），每篇之后加两个换行，整体内容与 all_text.txt 相同
+  corpus.idx  每篇文档一条定长记录 (doc_id, 来源类型, 起始字节, 结束字节, 文件名位置)
+任何阶段都可以内存映射 corpus.txt，按索引切出单篇文档，无需读入整个语料
+"""
+
+import os
+import mmap
+import struct
+
+MAGIC = b"NZCORP01"
+HEADER = struct.Struct("<8sI")          # magic, 文档数
+RECORD = struct.Struct("<IBQQII")       # doc_id, 来源, start, end, 文件名偏移, 文件名长度
+DOC_SEPARATOR = "\n\n"
+
+SOURCE_TYPES = {"": 0, "pdf": 1, "docx": 2, "txt": 3}
+SOURCE_NAMES = {v: k for k, v in SOURCE_TYPES.items()}
+
+
+def corpus_paths(path):
+    """由 corpus.idx / corpus.txt / corpus 任一路径得到 (文本路径, 索引路径)"""
+    base, ext = os.path.splitext(path)
+    if ext not in (".idx", ".txt"):
+        base = path
+    return base + ".txt", base + ".idx"
+
+
+def is_corpus(path):
+    """判断路径是否指向一个语料库（存在对应的 .idx 索引）"""
+    text_path, idx_path = corpus_paths(path)
+    return os.path.exists(idx_path) and os.path.exists(text_path)
+
+
+class CorpusWriter:
+    """顺序写入文档，close 时写出索引"""
+
+    def __init__(self, path):
+        self.text_path, self.idx_path = corpus_paths(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.text_path)), exist_ok=True)
+        self._blob = open(self.text_path + ".tmp", "wb")
+        self._records = []
+        self._names = bytearray()
+
+    def add(self, filename, source, chunks):
+        """写入一篇文档，chunks 为字符串或字符串迭代器，返回 doc_id"""
+        if isinstance(chunks, str):
+            chunks = [chunks]
+        start = self._blob.tell()
+        for chunk in chunks:
+            self._blob.write(chunk.encode("utf-8"))
+        end = self._blob.tell()
+        self._blob.write(DOC_SEPARATOR.encode("utf-8"))
+
+        name = filename.encode("utf-8")
+        doc_id = len(self._records)
+        self._records.append((doc_id, SOURCE_TYPES.get(source, 0), start, end,
+                              len(self._names), len(name)))
+        self._names += name
+        return doc_id
+
+    def close(self):
+        self._blob.close()
+        with open(self.idx_path + ".tmp", "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self._records)))
+            for record in self._records:
+                f.write(RECORD.pack(*record))
+            f.write(self._names)
+        os.replace(self.text_path + ".tmp", self.text_path)
+        os.replace(self.idx_path + ".tmp", self.idx_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._blob.close()
+
+
+class CorpusStore:
+    """只读语料库，文本以内存映射方式访问"""
+
+    def __init__(self, path):
+        self.text_path, self.idx_path = corpus_paths(path)
+        with open(self.idx_path, "rb") as f:
+            index = f.read()
+        magic, count = HEADER.unpack_from(index, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是语料库索引文件: {self.idx_path}")
+
+        names_at = HEADER.size + count * RECORD.size
+        names = index[names_at:]
+        self.docs = []
+        for doc_id, source, start, end, name_at, name_len in RECORD.iter_unpack(
+                index[HEADER.size:names_at]):
+            self.docs.append({
+                "doc_id": doc_id,
+                "filename": names[name_at:name_at + name_len].decode("utf-8"),
+                "source": SOURCE_NAMES.get(source, ""),
+                "start": start,
+                "end": end,
+            })
+
+        self._file = open(self.text_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # 空文件不能 mmap
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self):
+        return len(self.docs)
+
+    def doc_bytes(self, doc_id):
+        doc = self.docs[doc_id]
+        return self._mm[doc["start"]:doc["end"]]
+
+    def doc_text(self, doc_id):
+        """切出单篇文档的文本"""
+        return self.doc_bytes(doc_id).decode("utf-8")
+
+    def iter_docs(self):
+        """逐篇产出 (文档信息, 文本)"""
+        for doc in self.docs:
+            yield doc, self.doc_text(doc["doc_id"])
+
+    def doc_char_starts(self):
+        """各篇文档在 full_text() 中的起始字符位置"""
+        starts, pos = [], 0
+        for doc in self.docs:
+            starts.append(pos)
+            pos += len(self.doc_text(doc["doc_id"])) + len(DOC_SEPARATOR)
+        return starts
+
+    def full_text(self):
+        """整个语料的文本，与 all_text.txt 格式一致"""
+        return self._mm[:].decode("utf-8")
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,185 @@
+"""
+语料去重
+按内容哈希去掉完全相同的文档（例如同一篇文章的 PDF 和 Word 版本）和重复段落，
+哈希前去掉所有空白，避免不同提取方式造成的换行、空格差异；
+可选先清理页眉页脚，再用 MinHash/LSH 去掉近似重复的段落（见 boilerplate.py）
+
+每篇文档的哈希和签名（DocFingerprint）只取决于文档自身，可按内容缓存到磁盘；
+与全语料的比对依赖文档顺序，每次汇总都重新进行，但只需比较缓存中的哈希
+"""
+
+import os
+import hashlib
+
+import numpy as np
+
+from boilerplate import kept_line_numbers
+
+# 短于该长度（去空白后）的段落不参与去重，如标题、页码、单独的人名
+MIN_PARA_CHARS = 20
+
+# 指纹的计算方式变化时递增，使旧缓存自动失效
+FINGERPRINT_VERSION = "1"
+
+
+def content_hash(text):
+    """去掉空白后的 16 字节 blake2b 摘要"""
+    return hashlib.blake2b("".join(text.split()).encode("utf-8"), digest_size=16).digest()
+
+
+class DocFingerprint:
+    """一篇文档去重所需的全部哈希，段落以行号标识"""
+
+    def __init__(self, doc_key, kept_lines, para_keys, signatures):
+        self.doc_key = doc_key          # 整篇文档的 content_hash
+        self.kept_lines = kept_lines    # 清理页眉页脚后保留的行号，不清理时为 None
+        self.para_keys = para_keys      # 行号 -> 段落哈希，只含参与去重的段落
+        self.signatures = signatures    # 行号 -> MinHash 签名，只含参与近似检测的段落
+
+    def save(self, path):
+        lines = sorted(self.para_keys)
+        sig_lines = sorted(self.signatures)
+        arrays = {
+            "doc_key": np.frombuffer(self.doc_key, dtype=np.uint8),
+            "para_lines": np.array(lines, dtype=np.int64),
+            "para_keys": np.frombuffer(b"".join(self.para_keys[i] for i in lines),
+                                       dtype=np.uint8).reshape(len(lines), 16),
+            "sig_lines": np.array(sig_lines, dtype=np.int64),
+        }
+        if sig_lines:
+            arrays["signatures"] = np.stack([self.signatures[i] for i in sig_lines])
+        if self.kept_lines is not None:
+            arrays["kept_lines"] = np.array(self.kept_lines, dtype=np.int64)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + f".{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)   # 原子替换，避免并发写出半个文件
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            kept_lines = data["kept_lines"].tolist() if "kept_lines" in data else None
+            para_keys = dict(zip(data["para_lines"].tolist(),
+                                 (row.tobytes() for row in data["para_keys"])))
+            signatures = {}
+            if "signatures" in data:
+                signatures = dict(zip(data["sig_lines"].tolist(), data["signatures"]))
+            return cls(data["doc_key"].tobytes(), kept_lines, para_keys, signatures)
+
+
+class CorpusDeduper:
+    def __init__(self, min_para_chars=MIN_PARA_CHARS, strip_headers=False, near_dup=None,
+                 cache_dir=None):
+        self.min_para_chars = min_para_chars
+        self.strip_headers = strip_headers
+        self.near_dup = near_dup     # NearDuplicateFilter 或 None
+        self.cache_dir = cache_dir   # 指纹缓存目录，None 为不缓存
+        self.seen_docs = {}      # 文档哈希 -> 首次出现的文件名
+        self.seen_paras = set()
+        self.total_bytes = 0
+        self.dup_docs = 0
+        self.dup_doc_bytes = 0
+        self.dup_paras = 0
+        self.dup_para_bytes = 0
+        self.header_lines = 0
+        self.header_bytes = 0
+        self.near_dup_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # ---------- 单篇文档的指纹 ----------
+    def compute_fingerprint(self, text):
+        lines = text.split("\n")
+        kept_lines = kept_line_numbers(lines) if self.strip_headers else None
+        para_keys, signatures = {}, {}
+        for i in (range(len(lines)) if kept_lines is None else kept_lines):
+            chars = "".join(lines[i].split())
+            if len(chars) >= self.min_para_chars:
+                para_keys[i] = content_hash(chars)
+                if self.near_dup is not None and len(chars) >= self.near_dup.min_chars:
+                    signatures[i] = self.near_dup.signature(chars)
+        return DocFingerprint(content_hash(text), kept_lines, para_keys, signatures)
+
+    def _cache_path(self, text):
+        near_params = None if self.near_dup is None else self.near_dup.params
+        h = hashlib.sha256()
+        h.update(f"{FINGERPRINT_VERSION}|{self.min_para_chars}|{self.strip_headers}|"
+                 f"{near_params}|".encode("utf-8"))
+        h.update(text.encode("utf-8"))
+        key = h.hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + ".npz")
+
+    def fingerprint(self, text):
+        """返回文档的 DocFingerprint；有缓存目录时文档内容和去重参数不变就直接读取"""
+        if self.cache_dir is None:
+            return self.compute_fingerprint(text)
+        path = self._cache_path(text)
+        if os.path.exists(path):
+            try:
+                fingerprint = DocFingerprint.load(path)
+                self.cache_hits += 1
+                return fingerprint
+            except (OSError, ValueError, KeyError):
+                pass    # 缓存损坏时重新计算
+        self.cache_misses += 1
+        fingerprint = self.compute_fingerprint(text)
+        try:
+            fingerprint.save(path)
+        except OSError:
+            pass        # 缓存目录不可写时只是不缓存
+        return fingerprint
+
+    # ---------- 与全语料比对 ----------
+    def add_document(self, filename, text, fingerprint=None):
+        """返回去重后的文本；整篇重复时返回 None"""
+        if fingerprint is None:
+            fingerprint = self.fingerprint(text)
+        size = len(text.encode("utf-8"))
+        self.total_bytes += size
+
+        key = fingerprint.doc_key
+        if key in self.seen_docs:
+            self.dup_docs += 1
+            self.dup_doc_bytes += size
+            print(f"{filename} 与 {self.seen_docs[key]} 内容相同，跳过")
+            return None
+        self.seen_docs[key] = filename
+
+        lines = text.split("\n")
+        numbered = list(enumerate(lines))
+        if fingerprint.kept_lines is not None and len(fingerprint.kept_lines) < len(lines):
+            numbered = [(i, lines[i]) for i in fingerprint.kept_lines]
+            self.header_lines += len(lines) - len(numbered)
+            self.header_bytes += size - len("\n".join(line for _, line in numbered).encode("utf-8"))
+
+        kept = []
+        for i, para in numbered:
+            para_key = fingerprint.para_keys.get(i)
+            if para_key is not None:
+                if para_key in self.seen_paras:
+                    self.dup_paras += 1
+                    self.dup_para_bytes += len(para.encode("utf-8")) + 1
+                    continue
+                self.seen_paras.add(para_key)
+                sig = fingerprint.signatures.get(i)
+                if sig is not None and self.near_dup.is_duplicate_signature(sig):
+                    self.near_dup_bytes += len(para.encode("utf-8")) + 1
+                    continue
+            kept.append(para)
+        return "\n".join(kept)
+
+    def report(self):
+        removed = (self.dup_doc_bytes + self.dup_para_bytes
+                   + self.header_bytes + self.near_dup_bytes)
+        print(f"去重：重复文档 {self.dup_docs} 篇（{self.dup_doc_bytes:,} 字节），"
+              f"重复段落 {self.dup_paras} 段（{self.dup_para_bytes:,} 字节）")
+        if self.strip_headers:
+            print(f"页眉页脚：删除 {self.header_lines} 行（{self.header_bytes:,} 字节）")
+        if self.near_dup is not None:
+            print(f"近似重复段落：检查 {self.near_dup.checked} 段，删除 {self.near_dup.duplicates} 段"
+                  f"（{self.near_dup_bytes:,} 字节）")
+        print(f"共去除 {removed:,} / {self.total_bytes:,} 字节")
+        if self.cache_dir is not None:
+            total = self.cache_hits + self.cache_misses
+            print(f"去重指纹缓存：命中 {self.cache_hits} / {total}，未命中 {self.cache_misses}")
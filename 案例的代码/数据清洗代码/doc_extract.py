@@ -0,0 +1,214 @@
+"""
+PDF / Word 文本提取工具
+供 相关文本clean_text.py 调用，也可被进程池中的 worker 直接导入
+"""
+
+import zipfile
+import posixpath
+from collections import Counter
+from xml.etree import ElementTree as ET
+
+import pdfplumber
+
+# 快速提取引擎（可选依赖），直接读取 PDF 文本层，不做逐字符布局分析
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# 提取逻辑变化时递增，使旧缓存自动失效
+EXTRACTOR_VERSION = "1"
+
+PDF_ENGINES = ("pdfplumber", "pdfium")
+
+# 快速引擎结果的质量阈值
+MIN_CJK_RATIO = 0.2     # 中文字符占非空白字符的最低比例
+MAX_BAD_RATIO = 0.05    # 乱码字符（替换符、私用区、控制符）的最高比例
+
+
+# ======================
+# PDF
+# ======================
+def pdf_page_count(path):
+    """返回 PDF 页数；装有 pypdfium2 时只读页树，不像 pdfplumber 那样解析每一页"""
+    if pdfium is not None:
+        doc = pdfium.PdfDocument(path)
+        try:
+            return len(doc)
+        finally:
+            doc.close()
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def resolve_engine(engine):
+    """快速引擎不可用时退回 pdfplumber"""
+    if engine == "pdfium" and pdfium is None:
+        print("未安装 pypdfium2，改用 pdfplumber 提取")
+        return "pdfplumber"
+    return engine
+
+
+def looks_broken(text):
+    """判断快速引擎的结果是否不可用：空文本、乱码过多或中文字符过少"""
+    chars = "".join(text.split())
+    if not chars:
+        return True
+    bad = sum(1 for c in chars
+              if c == "\ufffd" or "\ue000" <= c <= "\uf8ff" or ord(c) < 32)
+    if bad > len(chars) * MAX_BAD_RATIO:
+        return True
+    cjk = sum(1 for c in chars if "\u4e00" <= c <= "\u9fff")
+    return cjk < len(chars) * MIN_CJK_RATIO
+
+
+def _iter_pdfplumber_pages(path, start, end, stats):
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages[start:end]:
+            text = page.extract_text() or ""
+            page.close()
+            if stats is not None:
+                stats["pdfplumber"] += 1
+            yield text
+
+
+def _iter_pdfium_pages(path, start, end, stats):
+    doc = pdfium.PdfDocument(path)
+    plumber = None  # 需要回退时才打开
+    try:
+        end = len(doc) if end is None else min(end, len(doc))
+        for i in range(start, end):
+            page = doc[i]
+            textpage = page.get_textpage()
+            text = textpage.get_text_range().replace("\r\n", "\n").strip()
+            textpage.close()
+            page.close()
+            engine = "pdfium"
+            if looks_broken(text):
+                if plumber is None:
+                    plumber = pdfplumber.open(path)
+                slow_page = plumber.pages[i]
+                text = slow_page.extract_text() or ""
+                slow_page.close()
+                engine = "pdfplumber"
+            if stats is not None:
+                stats[engine] += 1
+            yield text
+    finally:
+        if plumber is not None:
+            plumber.close()
+        doc.close()
+
+
+def iter_pdf_pages(path, start=0, end=None, engine="pdfplumber", stats=None):
+    """逐页产出 [start, end) 范围内的文本，无文本的页产出空字符串
+    每页提取后立即释放该页缓存的布局对象，内存占用与页数无关
+    engine="pdfium" 时先用快速引擎，结果异常的页自动回退 pdfplumber；
+    stats（Counter）按引擎累计页数"""
+    if engine == "pdfium" and pdfium is not None:
+        return _iter_pdfium_pages(path, start, end, stats)
+    return _iter_pdfplumber_pages(path, start, end, stats)
+
+
+def extract_pdf_pages(path, start=0, end=None, engine="pdfplumber", stats=None):
+    """提取 [start, end) 范围内每一页的文本，返回列表"""
+    return list(iter_pdf_pages(path, start, end, engine, stats))
+
+
+def split_page_ranges(page_count, chunk_pages):
+    """把页码切成若干 [start, end) 区间，用于大 PDF 的并行提取"""
+    if chunk_pages <= 0 or page_count <= chunk_pages:
+        return [(0, page_count)]
+    return [(s, min(s + chunk_pages, page_count))
+            for s in range(0, page_count, chunk_pages)]
+
+
+# ======================
+# Word
+# ======================
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+# 与 python-docx 的 Run.text 一致的 run 内文本元素
+RUN_TEXT = {
+    W_NS + "tab": "\t",
+    W_NS + "ptab": "\t",
+    W_NS + "cr": "\n",
+    W_NS + "noBreakHyphen": "-",
+}
+
+
+def _main_document_part(zf):
+    """从 _rels/.rels 找到正文部件，找不到时用默认的 word/document.xml"""
+    try:
+        rels = ET.fromstring(zf.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iter(REL_NS + "Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT:
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    return "word/document.xml"
+
+
+def iter_docx_paragraphs(path):
+    """逐段产出 Word 中每个段落的文本
+    直接增量解析 word/document.xml，不构建 python-docx 的完整对象模型；
+    结果与 python-docx 的 [p.text for p in Document(path).paragraphs] 相同：
+    只取正文顶层段落，段落文本由其直接子元素 w:r 和 w:hyperlink/w:r 组成"""
+    with zipfile.ZipFile(path) as zf:
+        with zf.open(_main_document_part(zf)) as xml:
+            stack = []
+            body = None
+            parts = []
+            for event, elem in ET.iterparse(xml, events=("start", "end")):
+                if event == "start":
+                    stack.append(elem.tag)
+                    if elem.tag == W_NS + "body" and body is None:
+                        body = elem
+                    continue
+
+                # stack[-1] 是当前元素；定位 body > p > [hyperlink >] r > 当前元素
+                depth = len(stack)
+                if body is not None and depth >= 4 and stack[-2] == W_NS + "r":
+                    tag = elem.tag
+                    if stack[-3] == W_NS + "p" and stack[-4] == W_NS + "body":
+                        in_para = True
+                    else:
+                        in_para = (depth >= 5 and stack[-3] == W_NS + "hyperlink"
+                                   and stack[-4] == W_NS + "p" and stack[-5] == W_NS + "body")
+                    if in_para:
+                        if tag == W_NS + "t":
+                            parts.append(elem.text or "")
+                        elif tag == W_NS + "br":
+                            br_type = elem.get(W_NS + "type", "textWrapping")
+                            parts.append("\n" if br_type == "textWrapping" else "")
+                        elif tag in RUN_TEXT:
+                            parts.append(RUN_TEXT[tag])
+
+                stack.pop()
+                if depth >= 2 and stack[-1] == W_NS + "body" and body is not None:
+                    if elem.tag == W_NS + "p":
+                        yield "".join(parts)
+                    parts = []
+                    # 释放已处理完的顶层元素，内存与文档长度无关
+                    elem.clear()
+                    body.remove(elem)
+
+
+def extract_docx_paragraphs(path):
+    """提取 Word 中每个段落的文本，返回列表"""
+    return list(iter_docx_paragraphs(path))
+
+
+# ======================
+# 进程池任务
+# ======================
+def run_task(task):
+    """执行一个提取任务：("pdf", path, start, end, engine) 或 ("docx", path)
+    返回 (文本列表, 各引擎页数)"""
+    kind, path = task[0], task[1]
+    if kind == "pdf":
+        stats = Counter()
+        return extract_pdf_pages(path, task[2], task[3], task[4], stats), dict(stats)
+    return extract_docx_paragraphs(path), {}
@@ -0,0 +1,117 @@
+"""
+词典实体匹配（Aho-Corasick 多模式自动机）
+所有词条编译成一个自动机，一次扫描找出全部实体，代价与词典大小无关；
+重叠时取最左最长、互不重叠的匹配，例如“东海龙王”只算一次东海龙王，不再同时算一次龙王；
+空闲状态下用正则跳到下一个可能的词首字符，大部分文本不进入逐字循环
+"""
+
+import re
+from collections import Counter, deque
+
+# _Automaton 的内部结构有变化时递增，序列化的自动机（见 entity_registry.py）随之失效
+MATCHER_VERSION = 1
+
+
+class _Automaton:
+    """纯 Python 的 Aho-Corasick 自动机"""
+
+    def __init__(self, patterns):
+        goto, out, depth = [{}], [-1], [0]
+        for pid, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(-1)
+                    depth.append(depth[state] + 1)
+                state = nxt
+            out[state] = pid
+
+        # 失配指针与“后缀中最近的词尾状态”指针，按层序计算
+        fail = [0] * len(goto)
+        dict_link = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                dict_link[nxt] = fail[nxt] if out[fail[nxt]] >= 0 else dict_link[fail[nxt]]
+                queue.append(nxt)
+
+        self.goto, self.fail, self.out, self.dict_link, self.depth = goto, fail, out, dict_link, depth
+        # 空闲时（没有进行中的匹配）直接跳到下一个可能的词首字符
+        first = "".join(re.escape(ch) for ch in goto[0])
+        self.first = re.compile(f"[{first}]") if first else None
+
+    def iter_long(self, text):
+        """逐个产出最左最长、互不重叠的匹配 (start, end, pid)"""
+        if self.first is None:
+            return
+        goto, fail, out, dict_link, depth = self.goto, self.fail, self.out, self.dict_link, self.depth
+        n = len(text)
+        i = state = 0
+        best = None
+        while True:
+            if i >= n:
+                if best is None:
+                    return
+                # 文本结束，提交候选后从其结尾继续扫描
+                yield best
+                i, state, best = best[1], 0, None
+                continue
+            if state == 0 and best is None:
+                m = self.first.search(text, i)
+                if m is None:
+                    return
+                i = m.start()
+
+            ch = text[i]
+            i += 1
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            s = state if out[state] >= 0 else dict_link[state]
+            while s:
+                start = i - depth[s]
+                if best is None or start < best[0] or (start == best[0] and i > best[1]):
+                    best = (start, i, out[s])
+                s = dict_link[s]
+
+            # 之后的匹配都从 i - depth[state] 之后开始，不可能比候选更靠左或等左更长
+            if best is not None and i - depth[state] > best[0]:
+                yield best
+                i, state, best = best[1], 0, None
+
+
+class EntityMatcher:
+    def __init__(self, patterns):
+        """patterns: 词条列表，重复和空串会被去掉；词条 id 为其在 self.patterns 中的下标"""
+        self.patterns = [p for p in dict.fromkeys(patterns) if p]
+        self.ids = {p: i for i, p in enumerate(self.patterns)}
+        self._automaton = _Automaton(self.patterns)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def iter_matches(self, text):
+        """逐个产出最左最长、互不重叠的匹配 (start, end, 词条 id)，按 start 递增"""
+        return self._automaton.iter_long(text)
+
+    def counts(self, text):
+        """词条 -> 出现次数（只含出现过的词条）"""
+        counter = Counter(pid for _, _, pid in self.iter_matches(text))
+        return {self.patterns[pid]: n for pid, n in counter.items()}
+
+    def offsets(self, text):
+        """词条 -> 各次出现的起始位置列表"""
+        found = {}
+        for start, _, pid in self.iter_matches(text):
+            found.setdefault(self.patterns[pid], []).append(start)
+        return found
@@ -0,0 +1,193 @@
+"""
+统一实体注册表
+实体词典只维护一份：实体抽取代码及结果/entity_registry.json，每个实体一行，
+  id      稳定的整数编号（新增实体只追加，不改已有编号）
+  name    规范名，各脚本输出都用它
+  type    实体类型
+  aliases 别名，匹配到别名即算作该实体（《封神演义》→ 封神演义，东海龙王 → 龙王）
+  tags    使用该实体的脚本（extractor / main / phase2），各脚本只取带自己标签的实体
+每个标签的规范名和别名各自编译成一个 Aho-Corasick 自动机（见 entity_matcher.py）：
+匹配取最左最长，若混入其他脚本的词条，较长的名字会吞掉本脚本需要的较短名字
+（哪吒传奇 中的 哪吒），因此各脚本的计数只取决于自己的词典。
+自动机序列化到注册表旁的 entity_registry.<标签>.automaton（不分标签时为 entity_registry.automaton），
+以注册表内容的 sha256、标签和自动机版本（entity_matcher.MATCHER_VERSION）为键；
+注册表未变化时直接加载，不再重新编译；缓存过期或无法读取时一律重新编译
+
+用法：python entity_registry.py [注册表路径] [-t 标签 ...]  预编译自动机并打印各类型实体数
+"""
+
+import os
+import json
+import time
+import argparse
+import pickle
+import hashlib
+from array import array
+
+from entity_matcher import MATCHER_VERSION, EntityMatcher, _Automaton
+
+DEFAULT_REGISTRY = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                 "..", "实体抽取代码及结果", "entity_registry.json"))
+CACHE_VERSION = 2
+
+
+class RegistryMatcher(EntityMatcher):
+    """patterns 为各实体的规范名（下标即实体在注册表中的序号），别名的匹配归到其实体；
+    counts / offsets 等接口与 EntityMatcher 相同，MentionIndex 可直接使用"""
+
+    def __init__(self, names, surfaces, owner, automaton=None):
+        self.patterns = list(names)
+        self.ids = {p: i for i, p in enumerate(self.patterns)}
+        self.surfaces = surfaces        # 自动机中的词条（规范名 + 别名）
+        self.owner = owner              # array("I")，词条 -> 实体序号
+        self._automaton = automaton if automaton is not None else _Automaton(surfaces)
+
+    def iter_matches(self, text):
+        """逐个产出 (start, end, 实体序号)；end 为实际匹配到的词条（可能是别名）的结尾"""
+        owner = self.owner
+        for start, end, pid in self._automaton.iter_long(text):
+            yield start, end, owner[pid]
+
+
+class EntityRegistry:
+    def __init__(self, entities, path=None, sha256=None):
+        self.entities = sorted(entities, key=lambda e: e["id"])
+        self.path = path
+        self.sha256 = sha256
+        self.cache_hit = None       # 最近一次 matcher() 是否命中磁盘缓存
+        self._matchers = {}         # 标签 -> RegistryMatcher
+
+        self.index = {}             # 规范名 / 别名 -> 实体序号
+        seen_ids = set()
+        for i, entity in enumerate(self.entities):
+            if entity["id"] in seen_ids:
+                raise ValueError(f"实体编号重复: {entity['id']}")
+            seen_ids.add(entity["id"])
+            for surface in [entity["name"]] + entity.get("aliases", []):
+                if surface in self.index:
+                    raise ValueError(f"实体名或别名重复: {surface}")
+                self.index[surface] = i
+
+    @classmethod
+    def load(cls, path=DEFAULT_REGISTRY):
+        with open(path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw.decode("utf-8"))
+        return cls(data["entities"], path, hashlib.sha256(raw).hexdigest())
+
+    def __len__(self):
+        return len(self.entities)
+
+    # ---------- 查询 ----------
+    def entity(self, name):
+        """按规范名或别名查实体，找不到返回 None"""
+        i = self.index.get(name)
+        return None if i is None else self.entities[i]
+
+    def canonical(self, name):
+        entity = self.entity(name)
+        return None if entity is None else entity["name"]
+
+    def names(self, type=None, tag=None):
+        """规范名列表（按编号），可按类型和标签过滤"""
+        return [e["name"] for e in self.entities
+                if (type is None or e["type"] == type) and (tag is None or tag in e["tags"])]
+
+    def grouped(self, tag=None):
+        """类型 -> 规范名列表，类型按首次出现的顺序"""
+        groups = {}
+        for e in self.entities:
+            if tag is None or tag in e["tags"]:
+                groups.setdefault(e["type"], []).append(e["name"])
+        return groups
+
+    # ---------- 自动机 ----------
+    def cache_path(self, tag=None):
+        if self.path is None:
+            return None
+        suffix = f".{tag}.automaton" if tag else ".automaton"
+        return os.path.splitext(self.path)[0] + suffix
+
+    def matcher(self, tag=None):
+        """只含带 tag 标签的实体（tag 为 None 时为全部实体）的 RegistryMatcher；
+        优先从磁盘缓存加载，缓存缺失或过期时编译并写回"""
+        if tag in self._matchers:
+            return self._matchers[tag]
+        selected = [(surface, i) for surface, i in self.index.items()
+                    if tag is None or tag in self.entities[i]["tags"]]
+        surfaces = [surface for surface, _ in selected]
+        owner = array("I", (i for _, i in selected))
+        names = [e["name"] for e in self.entities]
+
+        automaton = self._load_automaton(tag)
+        self.cache_hit = automaton is not None
+        matcher = RegistryMatcher(names, surfaces, owner, automaton)
+        if not self.cache_hit:
+            self._save_automaton(tag, matcher._automaton)
+        self._matchers[tag] = matcher
+        return matcher
+
+    def _load_automaton(self, tag):
+        path = self.cache_path(tag)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                version, matcher_version, sha256, cached_tag, automaton = pickle.load(f)
+        except Exception:
+            # 文件损坏，或 entity_matcher 重构后旧的序列化对象无法还原
+            # （AttributeError / ModuleNotFoundError 等），都当作缓存缺失
+            return None
+        if (version, matcher_version, sha256, cached_tag) != (CACHE_VERSION, MATCHER_VERSION,
+                                                              self.sha256, tag):
+            return None
+        if not isinstance(automaton, _Automaton):
+            return None
+        return automaton
+
+    def _save_automaton(self, tag, automaton):
+        path = self.cache_path(tag)
+        if path is None:
+            return
+        tmp = path + f".{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump((CACHE_VERSION, MATCHER_VERSION, self.sha256, tag, automaton), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)   # 原子替换，避免并发写出半个文件
+        except OSError:
+            # 注册表所在目录不可写时只是不缓存
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+_loaded = {}
+
+
+def load_registry(path=DEFAULT_REGISTRY):
+    """同一进程内每个注册表只读取一次"""
+    key = os.path.abspath(path)
+    if key not in _loaded:
+        _loaded[key] = EntityRegistry.load(path)
+    return _loaded[key]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="预编译实体注册表的自动机")
+    parser.add_argument("path", nargs="?", default=DEFAULT_REGISTRY, help="注册表路径")
+    parser.add_argument("-t", "--tag", action="append",
+                        help="只编译带该标签的实体，可重复；默认编译注册表中出现的每个标签")
+    args = parser.parse_args()
+
+    registry = EntityRegistry.load(args.path)
+    tags = args.tag or list(dict.fromkeys(t for e in registry.entities for t in e["tags"]))
+    print(f"{len(registry)} 个实体")
+    for tag in tags:
+        t0 = time.perf_counter()
+        matcher = registry.matcher(tag)
+        elapsed = time.perf_counter() - t0
+        source = "从缓存加载" if registry.cache_hit else "编译并写入缓存"
+        print(f"[{tag}] {len(matcher.surfaces)} 个词条（含别名），自动机{source}，"
+              f"用时 {elapsed:.2f} 秒 -> {registry.cache_path(tag)}")
+        for entity_type, names in registry.grouped(tag).items():
+            print(f"  {entity_type}: {len(names)}")
@@ -0,0 +1,86 @@
+"""
+基于文件内容哈希的提取缓存
+键 = sha256(提取器版本 + 文件类型 + 文件内容)，文件未变化时直接读取缓存，不再重新解析
+"""
+
+import os
+import json
+import hashlib
+
+from doc_extract import EXTRACTOR_VERSION
+
+DEFAULT_CACHE_DIR = ".extract_cache"
+
+
+def file_sha256(path, block_size=1 << 20):
+    """计算文件内容的 sha256"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ExtractCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, version=EXTRACTOR_VERSION):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, kind, path, variant=""):
+        """variant 区分同一文件的不同提取方式（如 PDF 引擎）"""
+        tag = f"{kind}/{variant}" if variant else kind
+        h = hashlib.sha256()
+        h.update(f"{self.version}|{tag}|".encode("utf-8"))
+        h.update(file_sha256(path).encode("ascii"))
+        return h.hexdigest()
+
+    def _entry_path(self, key):
+        # 每行一个页/段落的 JSON 字符串，便于逐条读写
+        return os.path.join(self.cache_dir, key[:2], key + ".jsonl")
+
+    def lookup(self, key):
+        """命中返回缓存条目路径，未命中返回 None"""
+        entry = self._entry_path(key)
+        if not os.path.exists(entry):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def read(self, entry):
+        """逐条产出缓存中的页/段落文本"""
+        with open(entry, encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def tee(self, key, units):
+        """边产出 units 边写入缓存，全部产出完毕后才提交缓存条目"""
+        entry = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp = entry + f".{os.getpid()}.tmp"
+        done = False
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for unit in units:
+                    f.write(json.dumps(unit, ensure_ascii=False) + "\n")
+                    yield unit
+            os.replace(tmp, entry)  # 原子替换，避免并发写出半个文件
+            done = True
+        finally:
+            if not done and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get_or_extract(self, kind, path, extract, variant=""):
+        """命中缓存直接逐条读取，否则调用 extract(path) 并边产出边写入缓存"""
+        key = self.key(kind, path, variant)
+        entry = self.lookup(key)
+        if entry is not None:
+            return self.read(entry)
+        return self.tee(key, extract(path))
+
+    def report(self):
+        total = self.hits + self.misses
+        print(f"提取缓存：命中 {self.hits} / {total}，未命中 {self.misses}")
@@ -0,0 +1,61 @@
+"""
+多部影片批处理
+扫描目录下的 .ass 字幕，每部影片交给一个工作进程处理（构图、情感分析等），
+收集每部影片的结果行和耗时，最后汇总成一张表
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+
+def list_films(folder):
+    """返回按文件名排序的 [(影片名, .ass 路径)]，影片名取自文件名"""
+    films = []
+    for file in sorted(os.listdir(folder)):
+        if file.lower().endswith(".ass"):
+            films.append((os.path.splitext(file)[0], os.path.join(folder, file)))
+    return films
+
+
+def _timed(process_film, name, path, output_dir):
+    t0 = time.perf_counter()
+    row = process_film(name, path, output_dir)
+    return dict({"影片": name}, **row, **{"耗时(秒)": round(time.perf_counter() - t0, 2)})
+
+
+def run_batch(films, process_film, output_dir=".", workers=None, summary_name="summary.csv"):
+    """process_film(影片名, 路径, 输出目录) -> 汇总表中的一行（字典），必须是模块级函数
+    单部影片出错只记录错误，不影响其他影片；汇总表按影片名排序写入 output_dir/summary_name"""
+    films = list(films)
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, summary_name)
+    if not films:
+        df = pd.DataFrame(columns=["影片"])
+        df.to_csv(summary_path, index=False, encoding="utf-8-sig")
+        print(f"没有需要处理的影片，已写入空汇总表：{summary_path}")
+        return df
+
+    rows = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_timed, process_film, name, path, output_dir): name
+                   for name, path in films}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                print(f"{name} 处理失败：{e!r}")
+                rows.append({"影片": name, "错误": repr(e)})
+                continue
+            print(f"{name} 完成，用时 {row['耗时(秒)']:.2f} 秒")
+            rows.append(row)
+
+    df = pd.DataFrame(rows).sort_values("影片").reset_index(drop=True)
+    df.to_csv(summary_path, index=False, encoding="utf-8-sig")
+    print(df.to_string(index=False))
+    print(f"共 {len(films)} 部影片，总用时 {time.perf_counter() - t0:.2f} 秒，汇总表：{summary_path}")
+    return df
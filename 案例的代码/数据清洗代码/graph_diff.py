@@ -0,0 +1,136 @@
+"""
+两部影片的共现图对比
+在共同词表上分别统计两部影片的共现矩阵（形状相同的上三角稀疏矩阵），
+共有边、独有边和权重差都用稀疏矩阵运算得到，不再逐条比较两个 networkx 图；
+结果可导出为表格（CSV）和按差异着色的网页图
+
+用法：python graph_diff.py nezha_processed.json fengshen_processed.json [--words] [-o graph_diff]
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+import pandas as pd
+import networkx as nx
+from scipy import sparse
+
+from ass_parser import parse_ass
+from cooccurrence import build_vocab, cooccurrence_matrix
+from graph_export import top_k_edges, export_static
+
+# 可视化中的边颜色
+DIFF_COLORS = {"共有": "#999999", "仅A": "#e74c3c", "仅B": "#3498db"}
+
+
+def load_texts(path, words=False):
+    """读取字幕（.ass 或 processed.json）；words=True 时用 jieba 分词，否则按字符"""
+    if path.endswith(".ass"):
+        lines = parse_ass(path)["cleaned"]
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = json.load(f)["cleaned"]
+    if words:
+        import jieba
+        return [[w for w in jieba.lcut(line) if w.strip()] for line in lines]
+    return lines
+
+
+def aligned_matrices(texts_a, texts_b):
+    """在两部影片的共同词表上统计共现矩阵，返回 (矩阵 A, 矩阵 B, id -> 词列表)"""
+    vocab, words = build_vocab(list(texts_a) + list(texts_b))
+    A, _ = cooccurrence_matrix(texts_a, vocab)
+    B, _ = cooccurrence_matrix(texts_b, vocab)
+    return A, B, words
+
+
+def graph_diff(A, B):
+    """返回 {"共有", "仅A", "仅B"} -> 0/1 稀疏矩阵，以及权重差 B - A"""
+    in_a = (A > 0).astype(np.int8)
+    in_b = (B > 0).astype(np.int8)
+    shared = in_a.multiply(in_b).tocsr()
+    masks = {"共有": shared, "仅A": (in_a - shared).tocsr(), "仅B": (in_b - shared).tocsr()}
+    for mask in masks.values():
+        mask.eliminate_zeros()
+    return masks, (B - A).tocsr()
+
+
+def diff_table(A, B, words, min_weight=1):
+    """逐边的对比表：两部影片中的权重、差值与类别，按差值绝对值降序；
+    两部影片中权重都小于 min_weight 的边不列出"""
+    masks, delta = graph_diff(A, B)
+    keep = sparse.csr_matrix(((A >= min_weight) + (B >= min_weight)).astype(np.int8))
+    frames = []
+    for kind, mask in masks.items():
+        coo = mask.multiply(keep).tocoo()
+        if not coo.nnz:
+            continue
+        r, c = coo.row, coo.col
+        frames.append(pd.DataFrame({
+            "词1": np.array(words, dtype=object)[r],
+            "词2": np.array(words, dtype=object)[c],
+            "A权重": np.asarray(A[r, c]).ravel(),
+            "B权重": np.asarray(B[r, c]).ravel(),
+            "差值": np.asarray(delta[r, c]).ravel(),
+            "类别": kind,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["词1", "词2", "A权重", "B权重", "差值", "类别"])
+    df = pd.concat(frames, ignore_index=True)
+    order = np.argsort(-np.abs(df["差值"].to_numpy()), kind="stable")
+    return df.iloc[order].reset_index(drop=True)
+
+
+def node_table(A, B, words):
+    """逐词的加权度（与该词相连的边权之和）对比，按差值绝对值降序"""
+    strength_a = np.asarray(A.sum(axis=0)).ravel() + np.asarray(A.sum(axis=1)).ravel()
+    strength_b = np.asarray(B.sum(axis=0)).ravel() + np.asarray(B.sum(axis=1)).ravel()
+    df = pd.DataFrame({"词": words, "A加权度": strength_a, "B加权度": strength_b,
+                       "差值": strength_b - strength_a})
+    df = df[(df["A加权度"] > 0) | (df["B加权度"] > 0)]
+    order = np.argsort(-np.abs(df["差值"].to_numpy()), kind="stable")
+    return df.iloc[order].reset_index(drop=True)
+
+
+def summary(A, B):
+    masks, delta = graph_diff(A, B)
+    counts = {kind: mask.nnz for kind, mask in masks.items()}
+    return dict(counts, **{"权重差绝对值之和": float(abs(delta).sum())})
+
+
+def visualize_diff(table, html_name, top_k=None, max_edges=2000):
+    """按差异着色：共有边灰色、仅A 红色、仅B 蓝色，边粗细为两部影片中较大的权重；
+    只画差值最大的 max_edges 条边，可再按每节点前 k 条边剪枝"""
+    G = nx.Graph()
+    for row in table.head(max_edges).itertuples(index=False):
+        G.add_edge(row[0], row[1], weight=max(row[2], row[3]), color=DIFF_COLORS[row[5]])
+    if top_k is not None:
+        H = top_k_edges(G, top_k)
+        for u, v in H.edges():
+            H[u][v]["color"] = G[u][v]["color"]
+        G = H
+    export_static(G, html_name)
+    print(f"对比图生成完成：{html_name}（{G.number_of_nodes()} 个节点，{G.number_of_edges()} 条边）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="两部影片共现图对比")
+    parser.add_argument("film_a", help=".ass 或 processed.json（A）")
+    parser.add_argument("film_b", help=".ass 或 processed.json（B）")
+    parser.add_argument("--words", action="store_true", help="按 jieba 分词构图（默认按字符）")
+    parser.add_argument("--min-weight", type=int, default=1, help="两部影片中权重都低于该值的边不列出")
+    parser.add_argument("--max-edges", type=int, default=2000, help="对比图中最多画的边数")
+    parser.add_argument("--top-k", type=int, default=None, help="对比图中每个节点只保留前 k 条边")
+    parser.add_argument("-o", "--output", default="graph_diff", help="输出文件名前缀")
+    args = parser.parse_args()
+
+    A, B, words = aligned_matrices(load_texts(args.film_a, args.words),
+                                   load_texts(args.film_b, args.words))
+    for key, value in summary(A, B).items():
+        print(f"{key}: {value:,}")
+    table = diff_table(A, B, words, args.min_weight)
+    table.to_csv(args.output + "_edges.csv", index=False, encoding="utf-8-sig")
+    node_table(A, B, words).to_csv(args.output + "_nodes.csv", index=False, encoding="utf-8-sig")
+    print(f"对比表已保存到: {os.path.abspath(args.output)}_edges.csv / _nodes.csv")
+    visualize_diff(table, args.output + ".html", args.top_k, args.max_edges)
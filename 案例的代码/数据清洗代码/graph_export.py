@@ -0,0 +1,80 @@
+"""
+大图的 pyvis 导出
+1. 剪枝：每个节点只保留权重最大的 k 条边，或用 disparity filter 提取骨干网络
+2. 离线计算节点坐标写入 HTML，并关闭物理引擎，浏览器打开时不再实时迭代布局
+3. 节点大小按加权度（strength）设置
+"""
+
+import numpy as np
+import networkx as nx
+from pyvis.network import Network
+
+
+def _edge_arrays(G):
+    """把图的边转成 (节点列表, 起点下标, 终点下标, 权重) 数组，便于向量化计算"""
+    nodes = list(G.nodes())
+    pos = {n: i for i, n in enumerate(nodes)}
+    edges = [(u, v, d.get("weight", 1)) for u, v, d in G.edges(data=True) if u != v]
+    u = np.fromiter((pos[e[0]] for e in edges), dtype=np.int64, count=len(edges))
+    v = np.fromiter((pos[e[1]] for e in edges), dtype=np.int64, count=len(edges))
+    w = np.fromiter((e[2] for e in edges), dtype=np.float64, count=len(edges))
+    return nodes, u, v, w
+
+
+def _subgraph(G, nodes, u, v, w, keep):
+    H = nx.Graph()
+    H.add_weighted_edges_from(
+        (nodes[a], nodes[b], G[nodes[a]][nodes[b]]["weight"])
+        for a, b in zip(u[keep], v[keep]))
+    return H
+
+
+def top_k_edges(G, k):
+    """每个节点保留权重最大的 k 条边（对任一端点是前 k 条即保留），去掉自环"""
+    nodes, u, v, w = _edge_arrays(G)
+    keep = np.zeros(len(w), dtype=bool)
+    for src in (u, v):
+        # 按 (节点, 权重降序) 排序后，组内名次 < k 的边保留
+        order = np.lexsort((-w, src))
+        sorted_src = src[order]
+        group_start = np.searchsorted(sorted_src, sorted_src, side="left")
+        rank = np.arange(len(order)) - group_start
+        keep[order[rank < k]] = True
+    return _subgraph(G, nodes, u, v, w, keep)
+
+
+def disparity_backbone(G, alpha=0.05):
+    """Serrano 等人的 disparity filter：对度为 k、强度为 s 的端点，
+    边的显著性 p = (1 - w/s)^(k-1)，任一端点 p < alpha 即保留"""
+    nodes, u, v, w = _edge_arrays(G)
+    n = len(nodes)
+    degree = np.bincount(u, minlength=n) + np.bincount(v, minlength=n)
+    strength = np.bincount(u, w, minlength=n) + np.bincount(v, w, minlength=n)
+    keep = np.zeros(len(w), dtype=bool)
+    for src in (u, v):
+        k = degree[src]
+        p = (1.0 - w / strength[src]) ** (k - 1)
+        # 度为 1 的节点只有这一条边，保留
+        keep |= (k == 1) | (p < alpha)
+    return _subgraph(G, nodes, u, v, w, keep)
+
+
+def export_static(G, html_name, scale=1000, min_size=5, max_size=40, seed=42):
+    """离线布局、关闭物理引擎，节点大小按加权度线性映射到 [min_size, max_size]"""
+    positions = nx.spring_layout(G, weight="weight", seed=seed) if len(G) else {}
+    strength = dict(G.degree(weight="weight"))
+    top = max(strength.values(), default=1) or 1
+
+    net = Network(height="750px", width="100%", notebook=False)
+    net.toggle_physics(False)
+    for node in G.nodes():
+        x, y = positions[node]
+        size = min_size + (max_size - min_size) * strength[node] / top
+        G.nodes[node]["size"] = size
+        net.add_node(node, label=node, size=size, color="red",
+                     x=float(x * scale), y=float(y * scale), physics=False)
+    for source, target, data in G.edges(data=True):
+        # 边上带 color 属性时沿用（如 graph_diff.py 的差异着色）
+        extra = {"color": data["color"]} if "color" in data else {}
+        net.add_edge(source, target, value=data["weight"], **extra)
+    net.write_html(html_name)
@@ -0,0 +1,82 @@
+"""
+增量提取清单
+记录每个源文件的 mtime、大小、内容哈希、提取引擎及版本、生成的输出文件，
+以及上次汇总语料时的设置（去重选项等），
+下次运行时只处理新增或修改过的文件，并清理已删除文件的输出
+"""
+
+import os
+import json
+
+from doc_extract import EXTRACTOR_VERSION
+from extract_cache import file_sha256
+
+DEFAULT_MANIFEST = ".clean_manifest.json"
+
+
+class IngestManifest:
+    def __init__(self, path=DEFAULT_MANIFEST):
+        self.path = path
+        self.entries = {}
+        self.settings = None    # 上次汇总语料时的设置，设置变化后需重新汇总
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if "sources" in data:
+                self.entries = data["sources"]
+                self.settings = data.get("settings")
+            else:
+                self.entries = data     # 旧版清单只有源文件记录
+
+    def is_current(self, src, engine, outputs):
+        """源文件自上次记录后未变化、提取方式相同且输出仍在，返回 True
+        mtime 和大小相同时不再计算哈希；只有 mtime 变化时用哈希确认"""
+        entry = self.entries.get(src)
+        if entry is None or entry.get("engine") != engine or entry.get("outputs") != outputs:
+            return False
+        if entry.get("extractor") != EXTRACTOR_VERSION:
+            return False
+        if not all(os.path.exists(p) for p in outputs):
+            return False
+        st = os.stat(src)
+        if st.st_size != entry["size"]:
+            return False
+        if st.st_mtime != entry["mtime"]:
+            if file_sha256(src) != entry["sha256"]:
+                return False
+            entry["mtime"] = st.st_mtime  # 内容没变，只是被 touch 过
+        return True
+
+    def record(self, src, engine, outputs):
+        """记录本次提取结果；旧记录中不再使用的输出（如改名前的文件）一并删除"""
+        old = self.entries.get(src)
+        if old is not None:
+            for out in set(old["outputs"]) - set(outputs):
+                if os.path.exists(out):
+                    os.remove(out)
+        st = os.stat(src)
+        self.entries[src] = {
+            "mtime": st.st_mtime,
+            "size": st.st_size,
+            "sha256": file_sha256(src),
+            "engine": engine,
+            "extractor": EXTRACTOR_VERSION,
+            "outputs": outputs,
+        }
+
+    def remove_missing(self, current_sources):
+        """删除已不存在的源文件的记录及其输出，返回被删除的源文件列表"""
+        removed = []
+        for src in sorted(set(self.entries) - set(current_sources)):
+            for out in self.entries.pop(src)["outputs"]:
+                if os.path.exists(out):
+                    os.remove(out)
+            removed.append(src)
+        return removed
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"settings": self.settings, "sources": self.entries}, f,
+                      ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
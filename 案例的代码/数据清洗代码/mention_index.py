@@ -0,0 +1,138 @@
+"""
+实体位置索引
+在实体匹配的同一次扫描中记录每次出现的字符位置、匹配长度、所在文档编号和句子编号，
+按实体 id 连续存放在 array 中（offsets[i]:offsets[i+1] 为第 i 个实体的区间，区间内按位置递增），
+“X 和 Y 同时出现的句子”之类的查询只需对两个有序数组求交集，不必重新扫描文本；
+匹配到别名时（《封神演义》记为封神演义）匹配长度与实体名长度不同，因此单独记录
+
+“句子”以句末标点（。！？；及半角 !?;，连同紧跟的右引号、右括号）或空行为界；
+单个换行不算断句：PDF 提取的文本按版面折行，大部分行在句子中间断开。
+空行是段落和文档之间的分隔（语料库各文档之间以空行连接），句子不会跨文档
+
+文件格式（mentions.idx）：头部 + 实体名 + offsets + positions + lengths + docs + sents + 句子结束位置
+"""
+
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_right
+
+import numpy as np
+
+MAGIC = b"NZMENT02"
+HEADER = struct.Struct("<8sIQQI")       # magic, 实体数, 出现总数, 句子数, 实体名字节数
+SENTENCE_END = re.compile(r"[。！？!?；;]+[”’」』）)]*\s*|\n[ \t\u3000]*\n\s*")
+
+
+def sentence_ends(text):
+    """每个句子的结束位置（不含），最后一句到文本末尾"""
+    ends = array("q", (m.end() for m in SENTENCE_END.finditer(text)))
+    if not ends or ends[-1] < len(text):
+        ends.append(len(text))
+    return ends
+
+
+class MentionIndex:
+    def __init__(self, names, offsets, positions, lengths, docs, sents, sent_ends):
+        self.names = list(names)
+        self.offsets = offsets        # array("q")，长度为实体数 + 1
+        self.positions = positions    # array("q")，字符位置
+        self.lengths = lengths        # array("H")，匹配到的文本长度
+        self.docs = docs              # array("I")，文档编号
+        self.sents = sents            # array("q")，句子编号
+        self.sent_ends = sent_ends    # array("q")，第 k 句为 [sent_ends[k-1], sent_ends[k])
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def build(cls, text, matcher, doc_starts=None):
+        """用 EntityMatcher 扫描一次文本建立索引；doc_starts 为各文档的起始字符位置（升序），
+        不提供时整个文本视为一篇文档"""
+        doc_starts = list(doc_starts or [0])
+        ends = sentence_ends(text)
+        per_id = [[] for _ in matcher.patterns]
+        for start, end, pid in matcher.iter_matches(text):
+            per_id[pid].append((start, end - start))
+
+        offsets, positions, lengths = array("q", [0]), array("q"), array("H")
+        docs, sents = array("I"), array("q")
+        for found in per_id:
+            starts = [p for p, _ in found]
+            positions.extend(starts)
+            lengths.extend(n for _, n in found)
+            docs.extend(bisect_right(doc_starts, p) - 1 for p in starts)
+            sents.extend(bisect_right(ends, p) for p in starts)
+            offsets.append(len(positions))
+        return cls(matcher.patterns, offsets, positions, lengths, docs, sents, ends)
+
+    # ---------- 持久化 ----------
+    def save(self, path):
+        names = "\n".join(self.names).encode("utf-8")
+        with open(path + ".tmp", "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.names), len(self.positions),
+                                len(self.sent_ends), len(names)))
+            f.write(names)
+            for arr in (self.offsets, self.positions, self.lengths, self.docs, self.sents,
+                        self.sent_ends):
+                arr.tofile(f)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            magic, n_names, n_mentions, n_sents, names_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"不是实体位置索引文件: {path}")
+            names = f.read(names_len).decode("utf-8").split("\n") if n_names else []
+            arrays = []
+            for typecode, count in (("q", n_names + 1), ("q", n_mentions), ("H", n_mentions),
+                                    ("I", n_mentions), ("q", n_mentions), ("q", n_sents)):
+                arr = array(typecode)
+                arr.fromfile(f, count)
+                arrays.append(arr)
+        return cls(names, *arrays)
+
+    # ---------- 查询 ----------
+    def _span(self, name):
+        i = self.ids[name]
+        return self.offsets[i], self.offsets[i + 1]
+
+    def counts(self):
+        """实体 -> 出现次数（只含出现过的实体）"""
+        return {name: self.offsets[i + 1] - self.offsets[i]
+                for i, name in enumerate(self.names) if self.offsets[i + 1] > self.offsets[i]}
+
+    def mentions(self, name):
+        """该实体各次出现的字符位置"""
+        lo, hi = self._span(name)
+        return self.positions[lo:hi]
+
+    def iter_mentions(self, name):
+        """逐次产出该实体的 (起始位置, 结束位置, 文档编号, 句子编号)"""
+        lo, hi = self._span(name)
+        return ((p, p + n, d, s) for p, n, d, s in zip(
+            self.positions[lo:hi], self.lengths[lo:hi], self.docs[lo:hi], self.sents[lo:hi]))
+
+    def sentences(self, name):
+        """出现过该实体的句子编号（升序、去重）"""
+        lo, hi = self._span(name)
+        return np.unique(np.frombuffer(self.sents, dtype=np.int64)[lo:hi])
+
+    def documents(self, name):
+        lo, hi = self._span(name)
+        return np.unique(np.frombuffer(self.docs, dtype=np.uint32)[lo:hi])
+
+    def co_sentences(self, *names):
+        """所有给定实体都出现过的句子编号"""
+        result = self.sentences(names[0])
+        for name in names[1:]:
+            result = np.intersect1d(result, self.sentences(name), assume_unique=True)
+        return result
+
+    def sentence_span(self, sid):
+        """第 sid 句在文本中的 [start, end)"""
+        return (self.sent_ends[sid - 1] if sid else 0), self.sent_ends[sid]
+
+    def sentence_text(self, text, sid):
+        start, end = self.sentence_span(sid)
+        return text[start:end]
@@ -0,0 +1,131 @@
+"""
+按时间索引的字幕存储
+对白按开始时间排序，区间查询不必每次扫描整部影片：
+  between(a, b)      开始时间落在 [a, b) 内的对白，二分定位
+  overlapping(a, b)  与 [a, b] 有重叠的对白（例如某个场景内出现过的所有台词）
+overlapping 拆成两部分：开始时间落在 [a, b] 内的对白是连续下标，二分定位；
+a 之前开始、a 时刻仍在显示的对白由中心区间树查出，O(log n + 命中数)。
+贯穿全片的水印、片头片尾字幕这类长对白只会在命中时被访问，不会拖慢其他查询
+时间可以是秒数，也可以是 "00:42:00" 这样的时间戳
+"""
+
+import json
+from array import array
+from bisect import bisect_left, bisect_right
+
+from ass_parser import iter_dialogues, parse_timestamp
+
+
+def to_seconds(t):
+    return parse_timestamp(t) if isinstance(t, str) else float(t)
+
+
+class _IntervalTree:
+    """静态中心区间树：每个节点取所辖端点的中位数为中心，
+    跨过中心的区间存两份（按开始升序、按结束降序），其余区间分到左右子树"""
+
+    def __init__(self, starts, ends):
+        self.starts, self.ends = starts, ends
+        self.root = self._build(list(range(len(starts))))
+
+    def _build(self, ids):
+        if not ids:
+            return None
+        points = sorted(p for i in ids for p in (self.starts[i], self.ends[i]))
+        center = points[len(points) // 2]
+        left, right, mid = [], [], []
+        for i in ids:
+            if self.ends[i] < center:
+                left.append(i)
+            elif self.starts[i] > center:
+                right.append(i)
+            else:
+                mid.append(i)
+        by_start = sorted(mid, key=self.starts.__getitem__)
+        by_end = sorted(mid, key=self.ends.__getitem__, reverse=True)
+        return center, self._build(left), self._build(right), by_start, by_end
+
+    def stabbing(self, t):
+        """包含时刻 t（start <= t <= end）的区间下标，顺序不定"""
+        found = []
+        node = self.root
+        while node is not None:
+            center, left, right, by_start, by_end = node
+            if t < center:
+                # 跨过中心的区间都在 t 之后结束，只需看开始时间
+                for i in by_start:
+                    if self.starts[i] > t:
+                        break
+                    found.append(i)
+                node = left
+            else:
+                for i in by_end:
+                    if self.ends[i] < t:
+                        break
+                    found.append(i)
+                node = right
+        return found
+
+
+class SubtitleIndex:
+    def __init__(self, events):
+        """events: 可迭代的 (开始秒, 结束秒, 文本)"""
+        events = sorted(events, key=lambda e: (e[0], e[1]))
+        self.starts = array("d", (e[0] for e in events))
+        self.ends = array("d", (e[1] for e in events))
+        self.texts = [e[2] for e in events]
+        self._tree = _IntervalTree(self.starts, self.ends)
+
+    @classmethod
+    def from_ass(cls, path):
+        return cls(iter_dialogues(path))
+
+    @classmethod
+    def from_processed(cls, json_path):
+        """从带 start/end 字段的 *_processed.json 构建"""
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(zip(data["start"], data["end"], data["cleaned"]))
+
+    @classmethod
+    def load(cls, path):
+        """根据扩展名选择 .ass 或 *_processed.json"""
+        return cls.from_ass(path) if path.endswith(".ass") else cls.from_processed(path)
+
+    def __len__(self):
+        return len(self.texts)
+
+    @property
+    def duration(self):
+        return max(self.ends) if self.texts else 0.0
+
+    def between_ids(self, a, b):
+        """开始时间在 [a, b) 内的对白下标"""
+        lo = bisect_left(self.starts, to_seconds(a))
+        hi = bisect_left(self.starts, to_seconds(b))
+        return range(lo, hi)
+
+    def overlapping_ids(self, a, b):
+        """与 [a, b] 有重叠（start <= b 且 end >= a）的对白下标"""
+        a, b = to_seconds(a), to_seconds(b)
+        if b < a:
+            return []
+        # a 之前开始、a 时刻仍未结束的对白；下标都小于 lo，排序后接在前面即保持时间顺序
+        earlier = sorted(i for i in self._tree.stabbing(a) if self.starts[i] < a)
+        lo = bisect_left(self.starts, a)
+        hi = bisect_right(self.starts, b)     # 之后的对白都在 b 之后开始
+        return earlier + list(range(lo, hi))
+
+    def between(self, a, b):
+        return [(self.starts[i], self.ends[i], self.texts[i]) for i in self.between_ids(a, b)]
+
+    def overlapping(self, a, b):
+        return [(self.starts[i], self.ends[i], self.texts[i]) for i in self.overlapping_ids(a, b)]
+
+    def windows(self, size, step=None):
+        """按固定时长切分整部影片，逐个产出 (窗口开始秒, 窗口内对白文本列表)"""
+        step = step or size
+        t = 0.0
+        while t < self.duration:
+            yield t, [self.texts[i] for i in self.overlapping_ids(t, t + size)]
+            t += step
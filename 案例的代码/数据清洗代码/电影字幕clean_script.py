@@ -1,33 +1,62 @@
+import os
 import json
-import networkx as nx
+import argparse
+from functools import partial
 from pyvis.network import Network
+from ass_parser import parse_ass
+from subtitle_index import SubtitleIndex
+from cooccurrence import cooccurrence_matrix, window_cooccurrence, matrix_to_graph
+from graph_export import top_k_edges, disparity_backbone, export_static
+from film_batch import list_films, run_batch
 
 # -------------------------------
 # 1️⃣ 数据加载函数
 # -------------------------------
 def load_clean_text(json_path):
+    # 也可以直接传入 .ass 字幕文件
+    if json_path.endswith(".ass"):
+        return parse_ass(json_path)["cleaned"]
     with open(json_path, encoding="utf-8") as f:
         data = json.load(f)
     return data["cleaned"]
 
+def load_scene_text(path, start, end):
+    """只取与 [start, end] 时间段重叠的对白（.ass 或带时间轴的 processed.json），
+    用于构建单个场景的图；时间可写成秒数或 "00:42:00" """
+    index = SubtitleIndex.load(path)
+    return [index.texts[i] for i in index.overlapping_ids(start, end)]
+
 # -------------------------------
 # 2️⃣ 构建图函数
 # -------------------------------
-def build_graph(texts):
-    G = nx.Graph()
-    for words in texts:
-        for i in range(len(words)):
-            for j in range(i + 1, len(words)):
-                if G.has_edge(words[i], words[j]):
-                    G[words[i]][words[j]]['weight'] += 1
-                else:
-                    G.add_edge(words[i], words[j], weight=1)
-    return G
+def build_graph(texts, min_weight=1):
+    # 词映射为 id 后在稀疏矩阵中批量计数，最后只保留权重 >= min_weight 的边
+    matrix, words = cooccurrence_matrix(texts)
+    return matrix_to_graph(matrix, words, min_weight)
+
+def build_window_graph(path, window, unit="lines", decay=1.0, min_weight=1):
+    """跨行共现图：相隔不超过 window 行（unit="lines"）或 window 秒（unit="seconds"）
+    的对白之间也连边，decay < 1 时按距离衰减权重；path 为 .ass 或带时间轴的 processed.json"""
+    index = SubtitleIndex.load(path)
+    matrix, words = window_cooccurrence(zip(index.starts, index.texts), window, unit, decay)
+    return matrix_to_graph(matrix, words, min_weight)
 
 # -------------------------------
 # 3️⃣ 可视化函数
 # -------------------------------
-def visualize_graph(G, html_name):
+def visualize_graph(G, html_name, top_k=None, backbone_alpha=None, static=False):
+    """top_k / backbone_alpha 先剪枝（每节点前 k 条边 / disparity filter 骨干）；
+    static=True 时离线计算布局并关闭物理引擎，节点按加权度设置大小，适合大图；
+    返回实际绘制的（剪枝后的）图"""
+    if top_k is not None:
+        G = top_k_edges(G, top_k)
+    if backbone_alpha is not None:
+        G = disparity_backbone(G, backbone_alpha)
+    if static:
+        export_static(G, html_name)
+        print(f"知识图谱生成完成：{html_name}（{G.number_of_nodes()} 个节点，{G.number_of_edges()} 条边）")
+        return G
+
     net = Network(height="750px", width="100%", notebook=False)
     net.force_atlas_2based()  # 力导向布局
 
@@ -43,17 +72,49 @@ def visualize_graph(G, html_name):
     # 输出 HTML
     net.show(html_name)
     print(f"知识图谱生成完成：{html_name}")
+    return G
 
 # -------------------------------
-# 4️⃣ 主程序
+# 4️⃣ 多部影片批处理
+# -------------------------------
+def graph_film(name, path, output_dir, top_k=None, backbone_alpha=None):
+    """单部影片：构图并导出 <影片名>_knowledge_graph.html（静态布局），返回汇总行；
+    节点数、边数为剪枝后导出的图，核心词按剪枝前的加权度选取"""
+    G = build_graph(load_clean_text(path))
+    strength = dict(G.degree(weight="weight"))
+    top_words = sorted((w for w in strength if w.strip()), key=strength.get, reverse=True)[:5]
+    G = visualize_graph(G, os.path.join(output_dir, f"{name}_knowledge_graph.html"),
+                        top_k=top_k, backbone_alpha=backbone_alpha, static=True)
+    return {"节点数": G.number_of_nodes(), "边数": G.number_of_edges(),
+            "核心词": "、".join(top_words)}
+
+# -------------------------------
+# 5️⃣ 主程序
 # -------------------------------
 if __name__ == "__main__":
-    # 哪吒
-    nezha_texts = load_clean_text("nezha_processed.json")
-    G_nezha = build_graph(nezha_texts)
-    visualize_graph(G_nezha, "nezha_knowledge_graph.html")
-
-    # 封神
-    fengshen_texts = load_clean_text("fengshen_processed.json")
-    G_fengshen = build_graph(fengshen_texts)
-    visualize_graph(G_fengshen, "fengshen_knowledge_graph.html")
+    parser = argparse.ArgumentParser(description="字幕共现知识图谱")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="批处理目录下所有 .ass 字幕，每部影片一个工作进程")
+    parser.add_argument("-o", "--output-dir", default="graphs", help="批处理输出目录")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数，默认为 CPU 核数")
+    parser.add_argument("--top-k", type=int, default=None, help="每个节点只保留权重最大的 k 条边")
+    parser.add_argument("--backbone", type=float, default=None, metavar="ALPHA",
+                        help="用 disparity filter 提取骨干，只保留显著性水平 ALPHA 下的边")
+    parser.add_argument("--static", action="store_true",
+                        help="离线计算布局并关闭物理引擎（批处理模式总是静态导出）")
+    args = parser.parse_args()
+    prune = dict(top_k=args.top_k, backbone_alpha=args.backbone)
+
+    if args.batch:
+        run_batch(list_films(args.batch), partial(graph_film, **prune),
+                  args.output_dir, args.workers, "graph_summary.csv")
+    else:
+        # 哪吒
+        nezha_texts = load_clean_text("nezha_processed.json")
+        G_nezha = build_graph(nezha_texts)
+        visualize_graph(G_nezha, "nezha_knowledge_graph.html", static=args.static, **prune)
+
+        # 封神
+        fengshen_texts = load_clean_text("fengshen_processed.json")
+        G_fengshen = build_graph(fengshen_texts)
+        visualize_graph(G_fengshen, "fengshen_knowledge_graph.html", static=args.static, **prune)
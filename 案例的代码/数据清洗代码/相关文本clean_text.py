@@ -1,75 +1,285 @@
-import pdfplumber
 import os
+import time
+import argparse
+from functools import partial
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from doc_extract import (EXTRACTOR_VERSION, PDF_ENGINES, pdf_page_count, iter_pdf_pages,
+                         iter_docx_paragraphs, split_page_ranges, resolve_engine, run_task)
+from extract_cache import ExtractCache, DEFAULT_CACHE_DIR
+from corpus_store import CorpusWriter
+from dedup import CorpusDeduper
+from boilerplate import NearDuplicateFilter
+from ingest_manifest import IngestManifest, DEFAULT_MANIFEST
 
 pdf_folder = "data/pdf"
+word_folder = "data/word"
 output_folder = "output"
-os.makedirs(output_folder, exist_ok=True)
 
-for file in os.listdir(pdf_folder):
-    if file.endswith(".pdf"):
-        pdf_path = os.path.join(pdf_folder, file)
-        text_all = ""
 
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    text_all += text + "\n"
+def list_sources():
+    """按文件名排序，保证串行与并行的处理顺序一致"""
+    sources = []
+    for file in sorted(os.listdir(pdf_folder)):
+        if file.endswith(".pdf"):
+            sources.append(("pdf", file, os.path.join(pdf_folder, file)))
+    for file in sorted(os.listdir(word_folder)):
+        if file.endswith(".docx"):
+            sources.append(("docx", file, os.path.join(word_folder, file)))
+    return sources
 
-        out_path = os.path.join(output_folder, file.replace(".pdf", ".txt"))
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(text_all)
 
-        print(f"{file} 提取完成")
-from docx import Document
+# ======================
+# 流式写出
+# ======================
+def output_path(kind, file):
+    """输出文件名保留源文件扩展名（a.pdf.txt / a.docx.txt），
+    同名的 PDF 和 Word 各有各的输出，重复内容留到汇总时去除"""
+    return os.path.join(output_folder, file + ".txt")
 
-word_folder = "data/word"
 
-for file in os.listdir(word_folder):
-    if file.endswith(".docx"):
-        doc_path = os.path.join(word_folder, file)
-        doc = Document(doc_path)
+def write_output(kind, file, units):
+    """逐页/逐段写入输出文件，不在内存中拼接整篇文本
+    PDF 跳过空页，每页后加换行；Word 每段后加换行"""
+    with open(output_path(kind, file), "w", encoding="utf-8") as f:
+        for text in units:
+            if text or kind != "pdf":
+                f.write(text + "\n")
+    print(f"{file} 提取完成")
 
-        text_all = ""
-        for para in doc.paragraphs:
-            text_all += para.text + "\n"
 
-        out_path = os.path.join("output", file.replace(".docx", ".txt"))
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(text_all)
+# ======================
+# 串行提取
+# ======================
+def open_units(kind, path, engine, stats, cache=None):
+    """返回逐页/逐段文本的迭代器，优先读缓存"""
+    if kind == "pdf":
+        extract = partial(iter_pdf_pages, engine=engine, stats=stats)
+        variant = "" if engine == "pdfplumber" else engine
+    else:
+        extract, variant = iter_docx_paragraphs, ""
+    if cache is not None:
+        return cache.get_or_extract(kind, path, extract, variant)
+    return extract(path)
 
-        print(f"{file} 提取完成")
-import pandas as pd
 
-data = []
+def extract_serial(sources, engine, stats, cache=None):
+    for kind, file, path in sources:
+        write_output(kind, file, open_units(kind, path, engine, stats, cache))
 
-for file in os.listdir("output"):
-    if file.endswith(".txt"):
-        with open(os.path.join("output", file), encoding="utf-8") as f:
-            content = f.read()
-            data.append({
-                "文件名": file,
-                "文本内容": content
-            })
 
-df = pd.DataFrame(data)
-df.to_csv("output/clean_data.csv", index=False, encoding="utf-8-sig")
-import pandas as pd
+# ======================
+# 并行提取（按文件切分，大 PDF 再按页区间切分）
+# ======================
+def collect_chunks(results, n_tasks, stats):
+    """依次取出同一文件的 n_tasks 个任务结果，累计引擎页数"""
+    for _ in range(n_tasks):
+        texts, counts = next(results)
+        stats.update(counts)
+        yield from texts
+
 
-data = []
+def extract_parallel(sources, workers, chunk_pages, engine, stats, cache=None):
+    plan = []   # (kind, file, 缓存键, 命中的缓存条目, 任务数)
+    tasks = []
+    for kind, file, path in sources:
+        key = entry = None
+        if cache is not None:
+            variant = engine if kind == "pdf" and engine != "pdfplumber" else ""
+            key = cache.key(kind, path, variant)
+            entry = cache.lookup(key)
+        n_tasks = 0
+        if entry is None:
+            if kind == "pdf":
+                for start, end in split_page_ranges(pdf_page_count(path), chunk_pages):
+                    tasks.append(("pdf", path, start, end, engine))
+                    n_tasks += 1
+            else:
+                tasks.append(("docx", path))
+                n_tasks = 1
+        plan.append((kind, file, key, entry, n_tasks))
 
-for file in os.listdir("output"):
-    if file.endswith(".txt"):
-        with open(os.path.join("output", file), encoding="utf-8") as f:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map 按提交顺序返回结果，按源文件顺序逐块写出，与串行结果一致
+        results = pool.map(run_task, tasks)
+        for kind, file, key, entry, n_tasks in plan:
+            if entry is not None:
+                units = cache.read(entry)
+            else:
+                units = collect_chunks(results, n_tasks, stats)
+                if cache is not None:
+                    units = cache.tee(key, units)
+            write_output(kind, file, units)
+
+
+# ======================
+# 汇总
+# ======================
+def build_csv(sources):
+    data = []
+
+    for kind, file, _ in sources:
+        with open(output_path(kind, file), encoding="utf-8") as f:
             content = f.read()
             data.append({
-                "文件名": file,
+                "文件名": os.path.basename(output_path(kind, file)),
                 "文本内容": content
             })
 
-df = pd.DataFrame(data)
-df.to_csv("output/clean_data.csv", index=False, encoding="utf-8-sig")
-with open("all_text.txt", "w", encoding="utf-8") as out:
-    for file in os.listdir("output"):
-        with open("output/" + file, encoding="utf-8") as f:
-            out.write(f.read() + "\n\n")
+    df = pd.DataFrame(data)
+    df.to_csv(os.path.join(output_folder, "clean_data.csv"), index=False, encoding="utf-8-sig")
+
+
+def assemble_corpus(sources, corpus_path, all_text_path=None, deduper=None):
+    """规范的语料汇总：只收录源文档的提取结果（不含 clean_data.csv 等其他文件），
+    可选去掉重复文档和重复段落，写入语料库，并按需写出 all_text.txt"""
+    all_text = open(all_text_path, "w", encoding="utf-8") if all_text_path else None
+    try:
+        with CorpusWriter(corpus_path) as writer:
+            for kind, file, _ in sources:
+                with open(output_path(kind, file), encoding="utf-8") as f:
+                    text = f.read()
+                if deduper is not None:
+                    text = deduper.add_document(file, text)
+                    if text is None:
+                        continue
+                writer.add(file, kind, text)
+                if all_text is not None:
+                    all_text.write(text + "\n\n")
+    finally:
+        if all_text is not None:
+            all_text.close()
+    print(f"语料库已写入：{writer.text_path}，{writer.idx_path}")
+    if deduper is not None:
+        deduper.report()
+
+
+def assembly_settings(args):
+    """影响汇总结果的设置，与清单中记录的不同时，即使源文件没变也要重新汇总"""
+    return {
+        "extractor": EXTRACTOR_VERSION,
+        "corpus": args.corpus,
+        "corpus_only": args.corpus_only,
+        "dedup": not args.no_dedup,
+        "strip_headers": not args.keep_headers,
+        "near_dup": not args.no_near_dup,
+        "near_dup_threshold": args.near_dup_threshold,
+    }
+
+
+def run_once(args, engine, stats, cache, manifest):
+    """执行一轮提取；有清单时只处理新增或修改过的文件，返回是否有变化"""
+    sources = list_sources()
+    settings = assembly_settings(args)
+    todo = sources
+    removed = []
+    if manifest is not None:
+        removed = manifest.remove_missing([path for _, _, path in sources])
+        todo = [(kind, file, path) for kind, file, path in sources
+                if not manifest.is_current(path, engine if kind == "pdf" else "",
+                                           [output_path(kind, file)])]
+        for src in removed:
+            print(f"{os.path.basename(src)} 已删除，清理其输出")
+        if not todo and not removed:
+            # 没有变化时只补齐缺失的汇总文件，汇总设置变化时重新汇总
+            outputs = [args.corpus + ".txt", args.corpus + ".idx"]
+            if not args.corpus_only:
+                outputs += [os.path.join(output_folder, "clean_data.csv"), "all_text.txt"]
+            if manifest.settings == settings and all(os.path.exists(p) for p in outputs):
+                manifest.save()
+                return False
+            if manifest.settings != settings:
+                print("汇总设置有变化，重新汇总")
+        print(f"新增或修改 {len(todo)} 个文件，删除 {len(removed)} 个文件")
+
+    if args.workers == 1:
+        extract_serial(todo, engine, stats, cache)
+    else:
+        extract_parallel(todo, args.workers or os.cpu_count(), args.chunk_pages,
+                         engine, stats, cache)
+
+    if manifest is not None:
+        for kind, file, path in todo:
+            manifest.record(path, engine if kind == "pdf" else "", [output_path(kind, file)])
+        manifest.save()
+
+    # 汇总文件只做拼接，不重新解析未变化的文档；
+    # 去重只对有变化的文档重新计算哈希和签名，其余文档读取指纹缓存
+    deduper = None
+    if not args.no_dedup:
+        near_dup = None if args.no_near_dup else NearDuplicateFilter(threshold=args.near_dup_threshold)
+        deduper = CorpusDeduper(strip_headers=not args.keep_headers, near_dup=near_dup,
+                                cache_dir=None if args.no_cache else os.path.join(args.cache_dir, "dedup"))
+    assemble_corpus(sources, args.corpus, None if args.corpus_only else "all_text.txt", deduper)
+    if not args.corpus_only:
+        build_csv(sources)
+    if manifest is not None:
+        manifest.settings = settings
+        manifest.save()
+
+    if stats:
+        print("PDF 页面提取引擎：" + "，".join(f"{k} {v} 页" for k, v in sorted(stats.items())))
+    if cache is not None:
+        cache.report()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF / Word 文本提取与清洗")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="并行进程数，1 为串行，0 为使用全部 CPU")
+    parser.add_argument("--chunk-pages", type=int, default=50,
+                        help="并行模式下大 PDF 每个任务的页数")
+    parser.add_argument("--engine", choices=PDF_ENGINES, default="pdfplumber",
+                        help="PDF 提取引擎，pdfium 为快速引擎，异常页自动回退 pdfplumber")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="提取缓存目录")
+    parser.add_argument("--no-cache", action="store_true", help="不使用提取缓存和去重指纹缓存")
+    parser.add_argument("--corpus", default="corpus",
+                        help="语料库路径前缀，生成 <前缀>.txt 与 <前缀>.idx")
+    parser.add_argument("--corpus-only", action="store_true",
+                        help="只生成语料库，不再写 clean_data.csv 和 all_text.txt")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="汇总时不去除重复文档和重复段落")
+    parser.add_argument("--keep-headers", action="store_true",
+                        help="汇总时保留文档内重复出现的页眉页脚行")
+    parser.add_argument("--no-near-dup", action="store_true",
+                        help="汇总时不做 MinHash/LSH 近似重复段落检测")
+    parser.add_argument("--near-dup-threshold", type=float, default=0.8,
+                        help="近似重复段落的 Jaccard 相似度阈值")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="增量提取清单路径")
+    parser.add_argument("--full", action="store_true",
+                        help="忽略清单，重新提取全部文件")
+    parser.add_argument("--watch", action="store_true",
+                        help="持续轮询 data/ 目录，有新增或修改的文件时自动提取")
+    parser.add_argument("--interval", type=float, default=10,
+                        help="轮询间隔（秒）")
+    args = parser.parse_args()
+
+    os.makedirs(output_folder, exist_ok=True)
+    cache = None if args.no_cache else ExtractCache(args.cache_dir)
+    engine = resolve_engine(args.engine)
+    stats = Counter()
+    manifest = IngestManifest(args.manifest)
+    if args.full:
+        manifest.entries = {}
+
+    if not run_once(args, engine, stats, cache, manifest):
+        print("没有新增或修改的文件")
+    if not args.watch:
+        return
+
+    print(f"监视 {pdf_folder} 和 {word_folder}，每 {args.interval:g} 秒检查一次（Ctrl+C 退出）")
+    try:
+        while True:
+            time.sleep(args.interval)
+            stats.clear()
+            run_once(args, engine, stats, cache, manifest)
+    except KeyboardInterrupt:
+        print("停止监视")
+
+
+if __name__ == "__main__":
+    main()